@@ -1,6 +1,15 @@
 from __future__ import annotations
 
-from conflict_task.devices import DataHandler, EMGConnector, InputDevice, Window
+from psychopy import logging
+
+from conflict_task.component import summarize_latencies
+from conflict_task.devices import (
+    AssetLoader,
+    DataHandler,
+    EMGConnector,
+    InputDevice,
+    Window,
+)
 from conflict_task.sequence import Screen, Sequence, Trial
 from conflict_task.util import get_or_fatal_exit, get_type
 
@@ -15,12 +24,19 @@ class Block:
         self.between: list[Screen] = None
         self.post: list[Screen] = None
 
+        self.latency_summaries: list[dict] = []
+        """Percentiles of the trials' response latencies, one summary per block run."""
+
+        self.latency_summary: bool = False
+        """Also write each latency summary to the data file, as a row after the block's trials."""
+
         self._parse_block_settings(block_settings)
 
     def _parse_block_settings(self, block_settings: dict):
         self.nr_blocks = get_type(block_settings, "nr_blocks", int)
         self.nr_trials = get_type(block_settings, "nr_trials", int)
         self.marker = get_type(block_settings, "marker", list)
+        self.latency_summary = get_type(block_settings, "latency_summary", bool, False)
         self._parse_sequence_settings(block_settings)
 
     def _parse_sequence_settings(self, block_settings: dict):
@@ -43,8 +59,12 @@ class Block:
         self.between = produce_auxiliary_screen_lists("between")
         self.post = produce_auxiliary_screen_lists("post")
 
-    def run_sequence(self, sequence: Sequence, trial_values={}, data={}):
-        continue_experiment = sequence.run(trial_values)
+    def run_sequence(
+        self, sequence: Sequence, trial_values={}, data={}, next_trial_values=None
+    ):
+        continue_experiment = sequence.run(
+            trial_values, next_trial_values=next_trial_values
+        )
 
         DataHandler.add_data_dict_and_next_entry(
             {
@@ -58,6 +78,11 @@ class Block:
             Window.quit()
 
     def run(self, trial_values_list: list[list[dict]] = [], experiment_data: dict = {}):
+        AssetLoader.finish()
+        self.trial.build_pools(
+            [trial_values for block in trial_values_list for trial_values in block]
+        )
+
         for block in range(self.nr_blocks):
             block_data = {
                 **experiment_data,
@@ -72,15 +97,47 @@ class Block:
 
             self.trial.start_persistent()
             
-            for trial in range(self.nr_trials):
-                trial_values = {
+            block_trial_values = [
+                {
                     **block_data,
                     "trial": trial + 1,
                     **trial_values_list[block][trial],
                 }
+                for trial in range(self.nr_trials)
+            ]
+
+            block_response_data = []
+
+            # Each trial prepares the next one during its post-trial interval
+            for trial, trial_values in enumerate(block_trial_values):
+                next_trial_values = (
+                    block_trial_values[trial + 1] if trial + 1 < self.nr_trials else None
+                )
 
                 self.run_sequence(
-                    self.trial, trial_values=trial_values, data=trial_values
+                    self.trial,
+                    trial_values=trial_values,
+                    data=trial_values,
+                    next_trial_values=next_trial_values,
+                )
+
+                if self.trial.response:
+                    block_response_data.append(
+                        self.trial.response_data or self.trial.response.get_response_data()
+                    )
+
+            latencies = summarize_latencies(block_response_data)
+            self.latency_summaries.append({**block_data, **latencies})
+            logging.info(f"Block {block + 1} response latencies: {latencies}")
+            if self.latency_summary and self.trial.response:
+                DataHandler.add_data_dict_and_next_entry(
+                    {
+                        **block_data,
+                        **{
+                            f"latency_summary.{key}": value
+                            for key, value in latencies.items()
+                        },
+                    }
                 )
 
             if self.marker:
@@ -1,5 +1,13 @@
 from conflict_task.block import Block
-from conflict_task.devices import DataHandler, EMGConnector, Window
+from conflict_task.devices import (
+    AssetLoader,
+    DataHandler,
+    EMGConnector,
+    InputDevice,
+    ResponseBox,
+    WaitScheduler,
+    Window,
+)
 from conflict_task.instructions import Instructions
 from conflict_task.util.dictionary import get_type_or_fatal_exit
 
@@ -25,13 +33,24 @@ class BlockExperiment:
             experiment_settings, "name", str, "Please specify experiment 'name'"
         )
         dlg_info = experiment_settings.get("extra_info", {})
+        dialog = experiment_settings.get("dialog", True)
 
-        DataHandler.start_participant_data(self.name, dlg_info=dlg_info)
+        DataHandler.start_participant_data(self.name, dlg_info=dlg_info, _dlg=dialog)
 
         if experiment_settings.get("marker", False):
             EMGConnector.connect()
 
+        if response_box := experiment_settings.get("response_box"):
+            ResponseBox.configure(**response_box)
+
+        if input_device := experiment_settings.get("input_device"):
+            InputDevice.select(input_device)
+
         Window.start()
+        WaitScheduler.calibrate()
+
+        if asset_loader := experiment_settings.get("asset_loader"):
+            AssetLoader.configure(**asset_loader)
 
         self.instructions = experiment_settings.get("instructions")
         if not isinstance(self.instructions, Instructions):
@@ -53,6 +72,9 @@ class BlockExperiment:
         return DataHandler.get_participant_number()
 
     def quit(self):
+        ResponseBox.stop()
+        EMGConnector.stop()
+        AssetLoader.shutdown()
         DataHandler.finish_participant_data()
         Window.quit()
 
@@ -1,5 +1,13 @@
 from ._base_component import BaseComponent
 from .audio_component import AudioComponent
-from .response_component import CorrectResponseComponent, ResponseComponent
+from .mouse_response_component import (
+    CorrectMouseResponseComponent,
+    MouseResponseComponent,
+)
+from .response_component import (
+    CorrectResponseComponent,
+    ResponseComponent,
+    summarize_latencies,
+)
 from .visual_component import VisualComponent
 from .wait_component import WaitComponent
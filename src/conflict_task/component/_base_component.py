@@ -1,10 +1,28 @@
 from conflict_task.constants import *
 from conflict_task.devices.EMG_connector import EMGConnector
+from conflict_task.devices.window import Window
 from conflict_task.util import *
 
 BASECOMPONENT_DATA_EXCLUSION = [
     "component",
     "variable_factor",
+    "frozen",
+    "pool",
+    "pool_factors",
+    "live_component",
+    "stimulus_type",
+    "stimulus_spec",
+    "texture_cache",
+    "visible",
+    "auto_draw",
+    "unit_conversions",
+    "match_spec_units",
+    "time_seen_global",
+    "mouse",
+    "cursor_was_visible",
+    "trajectory",
+    "applied_values",
+    "applied_component",
 ]
 
 
@@ -27,6 +45,11 @@ class BaseComponent:
                 c) None, which means the component will be displayed indefinitely until the end of the sequence.
 
             3) `variable`        (dict): Component member variables that will be different each sequence.
+
+            4) Timing in frames, for sequences with `frame_timing`. Overrides the time in seconds:
+                a) `start_frames`     (int): Flip the component starts on, counted from the sequence's first flip.
+                b) `stop_frames`      (int): Flip the component stops on.
+                c) `duration_frames`  (int): Number of flips between the component's start and stop.
         """
 
         self._base_component_should_not_be_run()
@@ -38,6 +61,9 @@ class BaseComponent:
         self.component = self
         """Reference to an object that trial values modify. Default: `self`"""
 
+        self.frozen: bool = False
+        """True once the component has been validated with `BaseComponent.freeze()`. Default: `False`."""
+
         self.variable_factor: dict = None
         """Dictionary of component member variables that will be different each sequence. Default: `None`."""
 
@@ -47,6 +73,15 @@ class BaseComponent:
         self.stop_time: float = INFINITY
         """Stop time for component relative to sequence start. Default:`Infinity`."""
 
+        self.start_frame: int = None
+        """Flip the component starts on, with frame timing. Default: `None`, converted from `start_time`."""
+
+        self.stop_frame: int = None
+        """Flip the component stops on, with frame timing. Default: `None`, converted from `stop_time`."""
+
+        self.duration_frames: int = None
+        """Number of flips the component lasts, with frame timing. Default: `None`."""
+
         self.marker_value: int = None
         """EMG marker to send on stimulus onset"""
 
@@ -70,6 +105,24 @@ class BaseComponent:
 
         self.time_stopped_global_flip: float = None
         """Screen flip time that component stopped, relative to experiment start.Default: `None`."""
+
+        self.onset_error_frames: int = None
+        """Frames between the requested `start_time` and the flip the component started on. Default: `None`."""
+
+        self.offset_error_frames: int = None
+        """Frames between the requested `stop_time` and the flip the component stopped on. Default: `None`."""
+
+        self.applied_sets: int = 0
+        """Variable factors set on `component` by the last `prepare`. Default: `0`."""
+
+        self.skipped_sets: int = 0
+        """Variable factors skipped by the last `prepare` because they were already set. Default: `0`."""
+
+        self.applied_values: dict = {}
+        """Last value set on `component` for each variable factor."""
+
+        self.applied_component = None
+        """The object `applied_values` were set on."""
         # -----------------------------------------------
 
         # -----------------------------------------------
@@ -83,6 +136,12 @@ class BaseComponent:
                 component_settings, "duration", float
             )
 
+        self.start_frame = get_type(component_settings, "start_frames", int)
+        if "stop_frames" in component_settings:
+            self.stop_frame = get_type(component_settings, "stop_frames", int)
+        elif "duration_frames" in component_settings:
+            self.duration_frames = get_type(component_settings, "duration_frames", int)
+
         self.variable_factor = get_type(component_settings, "variable", dict)
 
         true_or_fatal_exit(
@@ -94,12 +153,64 @@ class BaseComponent:
             f"{self.name} - Component stop time must not be less than the start time",
         )
 
+        true_or_fatal_exit(
+            (self.start_frame or 0) >= 0 and (self.duration_frames or 0) >= 0,
+            f"{self.name} - Component start and duration in frames can not be less than 0",
+        )
+        true_or_fatal_exit(
+            self.stop_frame is None or self.stop_frame >= (self.start_frame or 0),
+            f"{self.name} - Component stop frame must not be less than the start frame",
+        )
+
         self._parse_EMG_marker_settings(component_settings)
         # -----------------------------------------------
 
+    def uses_frames(self) -> bool:
+        """
+        Returns True if any of the component's timing is given in frames.
+        """
+
+        return (
+            self.start_frame is not None
+            or self.stop_frame is not None
+            or self.duration_frames is not None
+        )
+
+    def get_frames(self, frame_period: float) -> tuple[int, float]:
+        """
+        Returns the flips the component starts and stops on, converting times in seconds with `frame_period`.
+
+        The stop is `INFINITY` if the component has no stop time.
+        """
+
+        start = self.start_frame
+        if start is None:
+            start = round(self.start_time / frame_period)
+
+        if self.stop_frame is not None:
+            stop = self.stop_frame
+        elif self.duration_frames is not None:
+            stop = start + self.duration_frames
+        elif self.stop_time != INFINITY:
+            stop = round(self.stop_time / frame_period)
+        else:
+            stop = INFINITY
+
+        return start, stop
+
+    def get_stop_time(self, frame_period: float) -> float:
+        """
+        Returns the stop time in seconds, converting a stop in frames with `frame_period`.
+        """
+
+        if self.stop_frame is None and self.duration_frames is None:
+            return self.stop_time
+        return self.get_frames(frame_period)[1] * frame_period
+
     def send_marker_value(self) -> None:
+        # Sent right after the next flip, so it lines up with what is on screen
         if self.marker_value:
-            EMGConnector.send_marker(self.marker_value)
+            Window.after_flip(EMGConnector.send_marker_async, self.marker_value)
 
     def _parse_EMG_marker_settings(self, component_settings: dict) -> None:
         self._base_component_should_not_be_run()
@@ -118,15 +229,29 @@ class BaseComponent:
             "An instance of BaseComponent should not be created nor run",
         )
 
+    def freeze(self) -> None:
+        """
+        Validates the component once and marks it as frozen.
+
+        A frozen component skips the BaseComponent guard in `refresh`, `prepare`, `start`, `stop`,
+        `not_started`, `started`, `finished` and `get_data`, which are run every trial or every frame.
+        """
+
+        self._base_component_should_not_be_run()
+
+        self.frozen = True
+
     def refresh(self) -> None:
         """
         Refreshes component variables. Perform before each component use.
 
         For all components, this refreshes `status`, `time_started`, `time_started_refresh`,
-        `time_started_global`, `time_stopped`, `time_stopped_refresh` and `time_stopped_global`.
+        `time_started_global`, `time_stopped`, `time_stopped_refresh`, `time_stopped_global`,
+        `onset_error_frames`, `offset_error_frames`, `applied_sets` and `skipped_sets`.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         self.status = NOT_STARTED
         self.time_started = None
@@ -135,28 +260,73 @@ class BaseComponent:
         self.time_stopped = None
         self.time_stopped_flip = None
         self.time_stopped_global_flip = None
+        self.onset_error_frames = None
+        self.offset_error_frames = None
+        self.applied_sets = 0
+        self.skipped_sets = 0
 
     def prepare(self, trial_values: dict) -> None:
         """
         Sets the key-value pairs from `trial_values` on the component.
 
+        Values that are already set on the component from an earlier `prepare` are skipped.
+        `applied_sets` and `skipped_sets` count both.
+
         Args:
 
             `trial_values`   (dict): Dictionary of key-value pairs that link up component member variables (keys) with their respective values.
-
-            `component`       (Any): The object on which the `trial_values` are enacted on. Defaults to `self`.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         if self.variable_factor is not None:
 
+            if self.applied_component is not self.component:
+                self.applied_values = {}
+                self.applied_component = self.component
+
+            changes = {}
             for factor_name, factor_id in self.variable_factor.items():
                 true_or_fatal_exit(
                     factor_id in trial_values.keys(),
                     f"Subject trial sequence does not include key '{factor_id}' required by {self.name} component",
                 )
-                setattr(self.component, factor_name, trial_values[factor_id])
+                value = self._convert_value(factor_name, trial_values[factor_id])
+                if self._is_applied(factor_name, value):
+                    self.skipped_sets += 1
+                else:
+                    changes[factor_name] = value
+
+            self._apply_changes(changes)
+
+    def _is_applied(self, factor_name: str, value) -> bool:
+        if factor_name not in self.applied_values:
+            return False
+
+        applied = self.applied_values[factor_name]
+        if applied is value:
+            return True
+
+        try:
+            return bool(applied == value)
+        except ValueError:
+            # Arrays compare element-wise
+            return False
+
+    def _apply_changes(self, changes: dict) -> None:
+        for factor_name, value in changes.items():
+            setattr(self.component, factor_name, value)
+            self.applied_values[factor_name] = value
+
+        self.applied_sets += len(changes)
+
+    def _convert_value(self, factor_name: str, value):
+        """
+        Converts a trial value before it is set as `factor_name` on the component. Returns it unchanged by default.
+        """
+
+        return value
 
     def start(self, time, time_flip, global_flip) -> None:
         """
@@ -171,7 +341,8 @@ class BaseComponent:
             `timeGlobal`  (float): Screen flip time relative to experiment start.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         self.time_started = time
         self.time_started_flip = time_flip
@@ -191,19 +362,56 @@ class BaseComponent:
             `timeGlobal`               (float): Screen flip time relative to experiment start.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         self.time_stopped = time
         self.time_stopped_flip = time_flip
         self.time_stopped_global_flip = global_flip
         self.status = FINISHED
 
+    def record_timing_errors(
+        self, frame_period: float, frame_timing: bool = False
+    ) -> None:
+        """
+        Compares the requested start and stop times with the flip times the component
+        started and stopped on, and records the differences in whole frames.
+
+        With frame timing, the requested times are the flips from `get_frames`, the same
+        ones the sequence's timeline was compiled with.
+
+        Errors stay `None` if the component did not start or stop, or has no stop time.
+
+        Args:
+
+            `frame_period`  (float): Duration of one screen refresh.
+
+            `frame_timing`   (bool): The component was scheduled on flip counts.
+        """
+
+        if frame_timing:
+            start, stop = self.get_frames(frame_period)
+            start, stop = start * frame_period, stop * frame_period
+        else:
+            start, stop = self.start_time, self.stop_time
+
+        if self.time_started_flip is not None:
+            self.onset_error_frames = round(
+                (self.time_started_flip - start) / frame_period
+            )
+
+        if self.time_stopped_flip is not None and stop != INFINITY:
+            self.offset_error_frames = round(
+                (self.time_stopped_flip - stop) / frame_period
+            )
+
     def not_started(self) -> bool:
         """
         Returns True if component has not been started, false if not.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         return self.status == NOT_STARTED
 
@@ -212,7 +420,8 @@ class BaseComponent:
         Returns True if component has been started, false if not.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         return self.status == STARTED
 
@@ -221,7 +430,8 @@ class BaseComponent:
         Returns True if component has finished, false if not.
         """
 
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         return self.status == FINISHED
 
@@ -229,7 +439,8 @@ class BaseComponent:
         """
         Returns a dictionary of the component's data
         """
-        self._base_component_should_not_be_run()
+        if not self.frozen:
+            self._base_component_should_not_be_run()
 
         variables = vars(self)
 
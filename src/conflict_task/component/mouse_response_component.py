@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import numpy as np
+from psychopy import logging
+
+from conflict_task.constants import (
+    INFINITY,
+    MOUSE_MOVE_THRESHOLD,
+    MOUSE_TRAJECTORY_MAX_DURATION,
+)
+from conflict_task.devices import DataHandler, InputDevice, Window
+from conflict_task.util import *
+
+from .response_component import CorrectResponseComponent, ResponseComponent
+
+
+def summarize_trajectory(trajectory: np.ndarray) -> dict:
+    """
+    Computes the standard mouse-tracking measures of a `(t, x, y)` trajectory.
+
+    Returns:
+
+        Dictionary (dict) with `initiation_time`, the time the mouse first moved `MOUSE_MOVE_THRESHOLD`
+        away from its start, `path_length`, `max_deviation` from the straight line between the
+        first and last position, and the last position `final_x` and `final_y`.
+    """
+
+    summary = dict.fromkeys(
+        ["initiation_time", "path_length", "max_deviation", "final_x", "final_y"]
+    )
+    if not len(trajectory):
+        return summary
+
+    times = trajectory[:, 0].astype(np.float64)
+    positions = trajectory[:, 1:].astype(np.float64)
+    start, end = positions[0], positions[-1]
+
+    moved = np.flatnonzero(np.hypot(*(positions - start).T) > MOUSE_MOVE_THRESHOLD)
+    if moved.size:
+        summary["initiation_time"] = float(times[moved[0]])
+
+    summary["path_length"] = float(np.hypot(*np.diff(positions, axis=0).T).sum())
+
+    direction = end - start
+    distance = np.hypot(*direction)
+    if distance > 0:
+        # Perpendicular distance of every sample to the line from start to end
+        offsets = positions - start
+        deviations = (
+            offsets[:, 0] * direction[1] - offsets[:, 1] * direction[0]
+        ) / distance
+        summary["max_deviation"] = float(np.abs(deviations).max())
+    else:
+        summary["max_deviation"] = 0.0
+
+    summary["final_x"], summary["final_y"] = float(end[0]), float(end[1])
+    return summary
+
+
+class MouseResponseComponent(ResponseComponent):
+    """
+    Response component that also records the mouse trajectory while it runs.
+
+    The mouse position is sampled on every frame the component is checked, into a float32
+    `(t, x, y)` buffer that is allocated for the component's duration and reused every run.
+    Times are on the input device clock, like response times. Moving the mouse into one of
+    the `targets` counts as a response with that target's key, and keys can still be pressed.
+
+    After the run, the trajectory is saved next to the data file as a `.npy` file and only
+    its summary goes into the data. Both happen after the flip, not in the frame loop.
+    """
+
+    def __init__(self, component_settings: dict) -> None:
+        """
+        Takes in a `component_settings` dictionary to set up component variables.
+
+        Settings are those of a ResponseComponent, and can also include:
+
+            1) `targets`            (dict): Response key for each target, as `[x, y, radius]` in window units.
+
+            2) `max_duration`      (float): Longest trajectory to record if the component has no stop time.
+            Defaults to `MOUSE_TRAJECTORY_MAX_DURATION`.
+
+            3) `save_trajectory`    (bool): Save each trajectory as a `.npy` file next to the data file. Defaults to True.
+
+            4) `cursor_visible`     (bool): Show the mouse cursor while the component runs. Defaults to True.
+        """
+
+        # -----------------------------------------------
+        # Class variables
+        # -----------------------------------------------
+        self.targets: dict = None
+        """Response key for each target, as `[x, y, radius]`."""
+
+        self.max_duration: float = MOUSE_TRAJECTORY_MAX_DURATION
+        """Longest trajectory to record if the component has no stop time."""
+
+        self.save_trajectory: bool = True
+        """Save each trajectory as a `.npy` file next to the data file."""
+
+        self.cursor_visible: bool = True
+        """Show the mouse cursor while the component runs."""
+
+        self.cursor_was_visible: bool = None
+        """Whether the mouse cursor was shown before the component started. Restored when it stops."""
+
+        self.mouse = None
+        """Mouse created with `Window.create_mouse` on the first run."""
+
+        self.trajectory: np.ndarray = None
+        """Preallocated buffer of `(t, x, y)` samples."""
+
+        self.samples: int = 0
+        """Number of samples recorded this run."""
+
+        self.dropped_samples: int = 0
+        """Number of samples that did not fit in the buffer this run."""
+
+        self.runs: int = 0
+        """Number of times the component has started."""
+
+        self.trajectory_file: str = None
+        """File the trajectory of this run is saved to."""
+
+        self.initiation_time: float = None
+        self.path_length: float = None
+        self.max_deviation: float = None
+        self.final_x: float = None
+        self.final_y: float = None
+        # -----------------------------------------------
+
+        super().__init__(component_settings)
+
+        if (targets := get_type(component_settings, "targets", dict)) is not None:
+            true_or_fatal_exit(
+                all(key in self.keys for key in targets),
+                f"{self.name}: Mouse targets must be response keys. Targets are {list(targets)}",
+            )
+            true_or_fatal_exit(
+                all(
+                    isinstance(target, (list, tuple)) and len(target) == 3
+                    for target in targets.values()
+                ),
+                f"{self.name}: Mouse targets must be given as [x, y, radius]",
+            )
+            self.targets = targets
+
+        self.max_duration = get_type(
+            component_settings, "max_duration", float, MOUSE_TRAJECTORY_MAX_DURATION
+        )
+        self.save_trajectory = get_type(
+            component_settings, "save_trajectory", bool, True
+        )
+        self.cursor_visible = get_type(component_settings, "cursor_visible", bool, True)
+
+    def refresh(self) -> None:
+        """
+        Used before each component use.
+
+        For a MouseResponseComponent, this also refreshes the trajectory and its summary.
+        """
+
+        super().refresh()
+
+        self.samples = 0
+        self.dropped_samples = 0
+        self.trajectory_file = None
+        self.initiation_time = None
+        self.path_length = None
+        self.max_deviation = None
+        self.final_x = None
+        self.final_y = None
+
+    def _get_capacity(self) -> int:
+        # One sample per frame, with stops in frames counted as compiled
+        frame_period = Window.get_frame_period()
+        start, stop = self.get_frames(frame_period)
+        if stop == INFINITY:
+            frames = math.ceil(self.max_duration / frame_period)
+        else:
+            frames = stop - start
+        return frames + 2
+
+    def start(self, time, time_flip, global_flip) -> None:
+        self.cursor_was_visible = Window.get_mouse_visible()
+        if self.mouse is None:
+            self.mouse = Window.create_mouse(visible=self.cursor_visible)
+        else:
+            self.mouse.setVisible(self.cursor_visible)
+
+        capacity = self._get_capacity()
+        if self.trajectory is None or len(self.trajectory) < capacity:
+            self.trajectory = np.empty((capacity, 3), dtype=np.float32)
+
+        self.runs += 1
+        super().start(time, time_flip, global_flip)
+
+    def _sample(self) -> tuple[float, float, float]:
+        t = InputDevice.get_time()
+        x, y = self.mouse.getPos()
+
+        if self.samples < len(self.trajectory):
+            self.trajectory[self.samples] = (t, x, y)
+            self.samples += 1
+        else:
+            self.dropped_samples += 1
+
+        return t, x, y
+
+    def check(self) -> tuple[str, float]:
+        """
+        Samples the mouse position, then checks for a response.
+
+        A response is made by moving the mouse into one of the `targets`, or by pressing one of the `keys`.
+        """
+
+        if not self.started():
+            return (None, None)
+
+        t, x, y = self._sample()
+
+        if self.targets and not self.made:
+            for key, (target_x, target_y, radius) in self.targets.items():
+                if (x - target_x) ** 2 + (y - target_y) ** 2 <= radius**2:
+                    key_press = (key, t)
+                    self.time_seen = t
+                    self.time_seen_global = logging.defaultClock.getTime()
+                    self._process_response(key_press)
+                    self.latency_poll = 0.0
+                    self.send_marker_value()
+                    return key_press
+
+        return super().check()
+
+    def stop(self, time, time_flip, global_flip) -> None:
+        super().stop(time, time_flip, global_flip)
+        self.mouse.setVisible(self.cursor_was_visible)
+
+        if self.save_trajectory and DataHandler.filename:
+            self.trajectory_file = (
+                f"{DataHandler.filename}_{self.name}_{self.runs:04d}.npy"
+            )
+
+        # The buffer is not written to again before the next start, so it is not copied
+        Window.after_flip(
+            self._finish_trajectory,
+            self.trajectory[: self.samples],
+            self.trajectory_file,
+        )
+
+    def _finish_trajectory(self, trajectory: np.ndarray, path: str) -> None:
+        for name, value in summarize_trajectory(trajectory).items():
+            setattr(self, name, value)
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            np.save(path, trajectory)
+
+
+class CorrectMouseResponseComponent(MouseResponseComponent, CorrectResponseComponent):
+    """
+    Mouse response component that compares the response to a correct response, like a CorrectResponseComponent.
+    """
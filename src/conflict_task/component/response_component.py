@@ -1,11 +1,50 @@
 from __future__ import annotations
 
+import numpy as np
+from psychopy import logging
+
+from conflict_task.constants import RESPONSE_LATENCIES, RESPONSE_LATENCY_PERCENTILES
 from conflict_task.devices import EMGConnector, InputDevice
 from conflict_task.util import *
 
 from ._base_component import BaseComponent
 
 
+def summarize_latencies(
+    response_data: list[dict], percentiles: tuple = RESPONSE_LATENCY_PERCENTILES
+) -> dict:
+    """
+    Pools the response latencies of several runs into percentiles.
+
+    Args:
+
+        `response_data`     (list): `get_response_data()` of each run. Runs without a response are skipped.
+
+        `percentiles`      (tuple): Percentiles to report.
+
+    Returns:
+
+        Dictionary (dict) with the number of responses and `<latency>_p<percentile>` for each latency.
+    """
+
+    summary = {"responses": 0}
+    for latency in RESPONSE_LATENCIES:
+        values = np.array(
+            [
+                data[f"response_{latency}"]
+                for data in response_data
+                if data.get(f"response_{latency}") is not None
+            ]
+        )
+        summary["responses"] = max(summary["responses"], values.size)
+        for percentile in percentiles:
+            summary[f"{latency}_p{percentile}"] = (
+                float(np.percentile(values, percentile)) if values.size else None
+            )
+
+    return summary
+
+
 class ResponseComponent(BaseComponent):
     """
     Component to record user input through an InputDevice.
@@ -52,6 +91,21 @@ class ResponseComponent(BaseComponent):
 
         self.rt: float = None
         """The response time. Refreshes with `ResponseComponent.refresh()`."""
+
+        self.time_seen: float = None
+        """Input device time at which `check` saw the response."""
+
+        self.time_seen_global: float = None
+        """Global time at which `check` saw the response, on the clock of the flip timestamps."""
+
+        self.time_seen_flip: float = None
+        """Input device time of the first flip after the response was seen."""
+
+        self.latency_poll: float = None
+        """Time from the device registering the response to `check` seeing it."""
+
+        self.latency_flip: float = None
+        """Time from `check` seeing the response to the next flip."""
         # -----------------------------------------------
 
         # -----------------------------------------------
@@ -77,6 +131,10 @@ class ResponseComponent(BaseComponent):
     def start(self, time, time_flip, global_flip) -> None:
         super().start(time, time_flip, global_flip)
         InputDevice.reset_events()
+        self._open_response_window(time_flip)
+
+    def _open_response_window(self, time_flip: float) -> None:
+        InputDevice.open_response_window(self.keys, onset=time_flip)
 
     def refresh(self) -> None:
         """
@@ -85,7 +143,8 @@ class ResponseComponent(BaseComponent):
         For all components, this refreshes `status`, `time_started`, `time_started_refresh`,
         `time_started_global`, `time_stopped`, `time_stopped_refresh` and `time_stopped_global`.
 
-        For a ResponseComponent, this refreshes variables `made`, `key` and `rt`.
+        For a ResponseComponent, this refreshes variables `made`, `key` and `rt`,
+        and the response latencies.
         """
 
         super().refresh()
@@ -93,6 +152,11 @@ class ResponseComponent(BaseComponent):
         self.made = False
         self.key = None
         self.rt = None
+        self.time_seen = None
+        self.time_seen_global = None
+        self.time_seen_flip = None
+        self.latency_poll = None
+        self.latency_flip = None
 
     def check(self) -> tuple[str, float]:
         """
@@ -104,6 +168,8 @@ class ResponseComponent(BaseComponent):
 
             2) `key` and `rt` are recorded
 
+        Only reads presses already polled with `InputDevice.poll`, which the frame loop does once per frame.
+
         Args:
 
             `input_device`        (InputDevice): Device used to check input. Can be Keyboard or any Parallel port device.
@@ -114,21 +180,50 @@ class ResponseComponent(BaseComponent):
         """
 
         if self.started() and not self.made:
-            key_press = InputDevice.get_last_key(self.keys)
+            key_press = InputDevice.get_last_key(self.keys, poll=False)
 
             if key_press is not None:
+                self.time_seen = InputDevice.get_time()
+                self.time_seen_global = logging.defaultClock.getTime()
                 self._process_response(key_press)
+                self.latency_poll = self.time_seen - self.rt
                 self.send_marker_value()
 
                 return key_press
         return (None, None)
 
+    def record_flip(self, flip_timestamp: float) -> None:
+        """
+        Records the first flip after the response was seen. Called by the sequence after every flip.
+
+        Args:
+
+            `flip_timestamp`    (float): Time of the flip as returned by `Window.flip()`.
+        """
+
+        if self.time_seen_global is None or self.latency_flip is not None:
+            return
+        if flip_timestamp is None:
+            return
+
+        self.latency_flip = flip_timestamp - self.time_seen_global
+        self.time_seen_flip = self.time_seen + self.latency_flip
+
     def get_response_data(self) -> dict:
         return {
             "response_start": self.time_started_flip,
             "response_made": self.made,
             "response_key": self.key,
             "response_rt": self.rt,
+            "response_time_seen": self.time_seen,
+            "response_time_flip": self.time_seen_flip,
+            "response_latency_poll": self.latency_poll,
+            "response_latency_flip": self.latency_flip,
+            "response_latency_total": (
+                self.latency_poll + self.latency_flip
+                if self.latency_flip is not None
+                else None
+            ),
         }
 
     def _process_response(self, key_press) -> None:
@@ -221,8 +316,13 @@ class CorrectResponseComponent(ResponseComponent):
 
         self.correct_key = None
         self.correct = None
+        # `correct_key` is set again by `prepare`, even if the next trial has the same key
+        self.applied_values.pop("correct_key", None)
         self.marker_value = None
 
+    def _open_response_window(self, time_flip: float) -> None:
+        InputDevice.open_response_window(self.keys, self.correct_key, onset=time_flip)
+
     def stop(self, time, time_flip, global_flip) -> None:
         super().stop(time, time_flip, global_flip)
         if self.marker_values and not self.made:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+
+def estimate_texture_bytes(image) -> int:
+    """
+    Estimates the texture memory of `image` as 4 bytes per pixel. Only the file header is read.
+    """
+
+    if isinstance(image, np.ndarray):
+        return int(np.prod(image.shape[:2])) * 4
+
+    try:
+        with Image.open(image) as picture:
+            width, height = picture.size
+    except (OSError, AttributeError, ValueError):
+        return 0
+
+    return width * height * 4
+
+
+class TextureCache:
+    """
+    Least recently used cache of image stimuli, bounded by an estimated texture memory budget.
+
+    A stimulus is created on its first use or on a `prefetch` hint. When the cache goes over
+    `budget`, the least recently used stimuli are evicted, except for the one just used.
+    Supports `cache[image]` and `image in cache`, so it can stand in for a `preload` dictionary.
+    """
+
+    name = "texture_cache"
+
+    def __init__(
+        self,
+        create: Callable,
+        budget: int,
+        estimate: Callable[..., int] = estimate_texture_bytes,
+    ) -> None:
+        self.create: Callable = create
+        """Creates the stimulus for an image."""
+
+        self.budget: int = budget
+        """Texture memory, in bytes, the cached stimuli may take."""
+
+        self.estimate: Callable[..., int] = estimate
+        """Estimates the texture memory of an image in bytes."""
+
+        self._entries: OrderedDict = OrderedDict()
+        """Cached `(stimulus, bytes)` per image, from least to most recently used."""
+
+        self.used: int = 0
+        """Estimated texture memory of the cached stimuli, in bytes."""
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __contains__(self, image) -> bool:
+        return image in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, image):
+        if (entry := self._entries.get(image)) is not None:
+            self._entries.move_to_end(image)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        return self._add(image, self.estimate(image))
+
+    def _add(self, image, size: int):
+        stimulus = self.create(image)
+
+        self._entries[image] = (stimulus, size)
+        self.used += size
+        self._evict()
+
+        return stimulus
+
+    def _evict(self) -> None:
+        while self.used > self.budget and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.used -= size
+            self.evictions += 1
+
+    def prefetch(self, images: list) -> None:
+        """
+        Creates the stimuli of `images` in order, as long as they fit in the budget without evicting.
+
+        Args:
+
+            `images`    (list): Images in the order they are expected to be used.
+        """
+
+        for image in images:
+            if image in self._entries:
+                continue
+            size = self.estimate(image)
+            if self.used + size > self.budget:
+                break
+            self._add(image, size)
+
+    def get_data(self, prepend_key: bool = True) -> dict:
+        data = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "used": self.used,
+        }
+
+        if prepend_key:
+            data = {f"{self.name}.{key}": value for key, value in data.items()}
+
+        return data
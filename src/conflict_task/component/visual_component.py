@@ -1,9 +1,15 @@
-from psychopy import visual
+from collections import Counter
 
-from conflict_task.devices import Window
+from psychopy import logging, visual
+
+from conflict_task.constants import STIMULUS_POOL_CAP
+from conflict_task.devices import AssetLoader, UnitConverter, Window
 from conflict_task.util import *
 
 from ._base_component import BaseComponent
+from .texture_cache import TextureCache
+
+SHAPE_TYPES = ["ShapeStim", "Rect", "Circle", "Polygon", "Line", "Pie"]
 
 
 class VisualComponent(BaseComponent):
@@ -41,6 +47,23 @@ class VisualComponent(BaseComponent):
                 the [PsychoPy Website](https://www.psychopy.org/api/visual.html).
 
             3) `name`        (str): Because VisualComponents can be numerous, it's required to give each a name.
+
+            4) `pool_cap`    (int): Most stimuli to pre-build with `build_pool`. Defaults to `STIMULUS_POOL_CAP`.
+
+            5) `depth`     (float): Drawing depth in a sequence. Components with a greater depth are drawn behind. Defaults to 0.0.
+
+            6) `match_spec_units` (bool): Convert a variable shape `size` from pixels the same way as a `spec` size,
+            so ShapeStim sizes are converted too and no size is converted with `use_norm`. Defaults to False,
+            which converts variable Rect, Circle, Polygon, Line and Pie sizes even with `use_norm`.
+
+        For an image VisualComponent, settings can also include:
+
+            1) `preload`        (list): Images to create a stimulus for up front.
+
+            2) `async_preload`  (bool): Decode the `preload` images in the background with `AssetLoader`.
+
+            3) `texture_budget` (float): Texture memory in MB. Images are then loaded on first use or
+            prefetched by `build_pool` into a `TextureCache` of this size, instead of being preloaded.
         """
 
         # -----------------------------------------------
@@ -66,6 +89,21 @@ class VisualComponent(BaseComponent):
         )
 
         self.use_norm = get_type(component_settings, "use_norm", bool, False)
+        self.match_spec_units = get_type(
+            component_settings, "match_spec_units", bool, False
+        )
+
+        self.depth = get_type(component_settings, "depth", float, 0.0)
+        self.visible: bool = False
+        self.auto_draw: bool = True
+
+        self.pool_cap = get_type(component_settings, "pool_cap", int, STIMULUS_POOL_CAP)
+        self.pool: dict = None
+        self.pool_factors: list = None
+        self.live_component = None
+        self.stimulus_type: str = None
+        self.stimulus_spec: dict = None
+        self.unit_conversions: dict = {}
 
         self.create_visual_component(component_settings)
         # true_or_fatal_exit(
@@ -82,18 +120,34 @@ class VisualComponent(BaseComponent):
                 self.variable_factor["height"] = self.variable_factor["size"]
                 del self.variable_factor["size"]
             self.component = self.create_text_component(visual_spec)
+            self.stimulus_type = "TextStim"
         
         elif self.type == "image":
             self.preload = None
-            if "preload" in component_settings:
+            self.texture_cache = None
+
+            if (
+                texture_budget := get_type(component_settings, "texture_budget", float)
+            ) is not None:
+                self.texture_cache = TextureCache(
+                    lambda image: self.create_image_component({**visual_spec, "image": image}),
+                    budget=int(texture_budget * 2**20),
+                )
+            elif "preload" in component_settings:
                 self.preload = {}
+                async_preload = get_type(component_settings, "async_preload", bool, False)
                 for image in component_settings["preload"]:
-                    self.preload[image] = self.create_image_component({
-                            **visual_spec,
-                            "image": image,
-                        })
+                    if async_preload:
+                        AssetLoader.load(image, self._preload_decoded(image, visual_spec))
+                    else:
+                        self.preload[image] = self.create_image_component({
+                                **visual_spec,
+                                "image": image,
+                            })
             
-            if "image" in visual_spec and self.preload:
+            if "image" in visual_spec and self.texture_cache is not None:
+                self.component = self.texture_cache[visual_spec["image"]]
+            elif "image" in visual_spec and self.preload:
                 if (image := visual_spec["image"]) in self.preload:
                     self.component = self.preload[image]
                 else:
@@ -101,8 +155,14 @@ class VisualComponent(BaseComponent):
                     self.preload[image] = self.component
             else:
                 self.component = self.create_image_component(visual_spec)
+            self.stimulus_type = "ImageStim"
             
-            if "image" in self.variable_factor and self.preload:
+            # Async preloads only fill `preload` once they are uploaded
+            if "image" in self.variable_factor and (
+                self.preload
+                or component_settings.get("preload")
+                or self.texture_cache is not None
+            ):
                 self.variable_image = self.variable_factor["image"]
                 del self.variable_factor["image"]
             else:
@@ -116,6 +176,27 @@ class VisualComponent(BaseComponent):
                 visual_spec["size"] = Window.pix2norm_size(visual_spec["size"])
                 
             self.component = self.create_other_component(self.type, visual_spec)
+            self.stimulus_type = self.type
+
+        self.stimulus_spec = visual_spec
+
+        # Window conversion of each variable factor given in pixels or points
+        if self.variable_factor:
+            if self.type == "text" and "height" in self.variable_factor:
+                self.unit_conversions["height"] = "pt2norm_size"
+            elif "size" in self.variable_factor and self.type in SHAPE_TYPES:
+                if self.match_spec_units:
+                    convert_size = not self.use_norm
+                else:
+                    # Variable ShapeStim sizes were never converted, and other shape sizes ignored `use_norm`
+                    convert_size = self.type != "ShapeStim"
+                if convert_size:
+                    self.unit_conversions["size"] = "pix2norm_size"
+
+        # Every trial value the stimulus depends on, in pool key order
+        self.pool_factors = list((self.variable_factor or {}).values())
+        if self.type == "image" and self.variable_image:
+            self.pool_factors.append(self.variable_image)
 
     @staticmethod
     def create_text_component(spec_settings):
@@ -123,17 +204,23 @@ class VisualComponent(BaseComponent):
             spec_settings["height"] = Window.pt2norm_size(spec_settings["size"])
             del spec_settings["size"]
 
-        return visual.TextStim(Window._window, **spec_settings)
+        return Window.create_stimulus("TextStim", spec_settings)
+
 
+    def _preload_decoded(self, image: str, visual_spec: dict):
+        def add_to_preload(decoded):
+            self.preload[image] = self.create_image_component({**visual_spec, "image": decoded})
+
+        return add_to_preload
 
     @staticmethod
     def create_image_component(spec_settings):
-        return visual.ImageStim(Window._window, **spec_settings)
+        return Window.create_stimulus("ImageStim", spec_settings)
 
     @staticmethod
     def create_other_component(type, spec_settings):
         if hasattr(visual, type):
-            return getattr(visual, type)(Window._window, **spec_settings)
+            return Window.create_stimulus(type, spec_settings)
         else:
             fatal_exit(f"No component named {type}")
 
@@ -149,49 +236,146 @@ class VisualComponent(BaseComponent):
         super().refresh()
         self._turn_auto_draw_off()
     
+    def _get_pool_key(self, trial_values: dict) -> tuple:
+        return tuple(trial_values[factor_id] for factor_id in self.pool_factors)
+
+    def build_pool(self, trial_values_list: list[dict]) -> None:
+        """
+        Converts the pixel and point values in `trial_values_list` to window units with `UnitConverter`,
+        and pre-builds one stimulus per combination of variable values.
+
+        `prepare` then swaps in the pre-built stimulus, like image `preload`, instead of setting
+        each variable on the stimulus. If there are more combinations than `pool_cap`, only the
+        most common ones are built and the rest are prepared live on the component's own stimulus.
+
+        Args:
+
+            `trial_values_list`    (list): Trial values of every trial the component will be run with.
+        """
+
+        for factor_name, conversion in self.unit_conversions.items():
+            factor_id = self.variable_factor[factor_name]
+            UnitConverter.convert_column(
+                conversion, [trial_values[factor_id] for trial_values in trial_values_list]
+            )
+
+        # Preloaded and cached images already are a pool of their own
+        if self.type == "image" and self.variable_image:
+            if self.texture_cache is not None:
+                self.texture_cache.prefetch(
+                    list(dict.fromkeys(values[self.variable_image] for values in trial_values_list))
+                )
+            return
+
+        if not self.pool_factors or self.pool_cap <= 0:
+            return
+
+        try:
+            counts = Counter(
+                self._get_pool_key(trial_values) for trial_values in trial_values_list
+            )
+        except TypeError:
+            logging.warning(f"{self.name}: Variable values are not hashable, stimuli are not pooled")
+            return
+
+        if len(counts) > self.pool_cap:
+            logging.warning(
+                f"{self.name}: {len(counts)} stimulus variations exceed the pool cap of {self.pool_cap}, "
+                "the rest are prepared live"
+            )
+
+        if self.live_component is None:
+            self.live_component = self.component
+
+        self.pool = {}
+        for key, _ in counts.most_common(self.pool_cap):
+            self.pool[key] = self._create_pooled_stimulus(dict(zip(self.pool_factors, key)))
+
+        self.component = self.live_component
+
+    def _create_pooled_stimulus(self, trial_values: dict):
+        spec = self.stimulus_spec.copy()
+        if self.type == "image" and self.variable_image:
+            spec["image"] = trial_values[self.variable_image]
+
+        self.component = Window.create_stimulus(self.stimulus_type, spec)
+        super().prepare(trial_values)
+        return self.component
+
     def prepare(self, trial_values: dict) -> None:
+        if self.variable_factor is not None and self.pool is not None:
+            if (stimulus := self.pool.get(self._get_pool_key(trial_values))) is not None:
+                self.component = stimulus
+                return
+            self.component = self.live_component
+
         if self.variable_factor is not None:
-            if self.type == "text":
-                ## Dirty hack for a stupid bug
-                if "text" in self.variable_factor:
-                    self.component.text = ""  # Value needs to be forcefully changed for other attributes to take effect
-                if "size" in self.variable_factor:
-                    trial_values["height"] = Window.pt2norm_size(trial_values["size"])
-            elif "size" in self.variable_factor:
-                if self.type in ["shape", "Rect", "Circle", "Polygon", "Line", "Pie"]:
-                    trial_values["size"] = Window.pix2norm_size(trial_values["size"])
-            
-            if self.type == "image":
-                if self.variable_image:
-                    image = trial_values[self.variable_image]
-                    self.component = self.preload[image]
-                    super().prepare(trial_values)
+            if self.type == "image" and self.variable_image:
+                image = trial_values[self.variable_image]
+                if self.texture_cache is not None:
+                    self.component = self.texture_cache[image]
                 else:
-                    super().prepare(trial_values)
-            
-            else:
-                super().prepare(trial_values)
+                    if image not in self.preload:
+                        AssetLoader.finish()
+                    self.component = self.preload[image]
+
+            super().prepare(trial_values)
+
+    def _apply_changes(self, changes: dict) -> None:
+        ## Dirty hack for a stupid bug
+        if changes and self.type == "text" and "text" in self.variable_factor:
+            self.component.text = ""  # Value needs to be forcefully changed for other attributes to take effect
+            changes.setdefault("text", self.applied_values.get("text"))
+
+        super()._apply_changes(changes)
+
+    def _convert_value(self, factor_name: str, value):
+        if (conversion := self.unit_conversions.get(factor_name)) is not None:
+            return UnitConverter.convert(conversion, value)
+        return value
+
 
+    def get_data(self, prepend_key: bool = True) -> dict:
+        data = super().get_data(prepend_key=prepend_key)
+
+        if self.type == "image" and self.texture_cache is not None:
+            cache_data = self.texture_cache.get_data()
+            if prepend_key:
+                cache_data = {f"{self.name}.{key}": value for key, value in cache_data.items()}
+            data.update(cache_data)
+
+        return data
+
+    def draw(self) -> None:
+        """
+        Draws the visual stimulus connected to this component once, for the next screen flip.
+        """
+
+        self.component.draw()
 
     def _turn_auto_draw_on(self) -> None:
         """
-        Turns AutoDraw on for the visual stimulus connected to this component.
+        Makes the component visible.
 
+        If `auto_draw` is set, this turns AutoDraw on for the visual stimulus connected to this component.
         AutoDraw means that the component is automatically drawn before each screen flip.
-        If not turned on, visual stimulus must be explicitly drawn before each frame.
+        Otherwise the sequence that owns the component draws it while it is `visible`.
         """
 
-        self.component.setAutoDraw(True)
+        self.visible = True
+        if self.auto_draw:
+            self.component.setAutoDraw(True)
 
     def _turn_auto_draw_off(self) -> None:
         """
-        Turns AutoDraw off for the visual stimulus connected to this component.
+        Makes the component invisible.
 
-        AutoDraw means that the component is automatically drawn before each screen flip.
-        If not turned on, visual stimulus must be explicitly drawn before each frame.
+        If `auto_draw` is set, this turns AutoDraw off for the visual stimulus connected to this component.
         """
 
-        self.component.setAutoDraw(False)
+        self.visible = False
+        if self.auto_draw:
+            self.component.setAutoDraw(False)
 
     def start(self, time, time_flip, global_flip) -> None:
         """
@@ -240,7 +424,7 @@ class TextComponent(VisualComponent):
         self.handle_size_height(self.variable_factor)
         self.handle_size_height(visual_spec, Window.pt2norm_size)
         
-        self.component = visual.TextStim(Window._window, **visual_spec)
+        self.component = Window.create_stimulus("TextStim", visual_spec)
 
     @staticmethod
     def handle_size_height(dictionary: dict, func = None):
@@ -271,7 +455,7 @@ class ImageComponent(VisualComponent):
         if "preload" in component_settings:
             self.preload = {}
             for image in component_settings["preload"]:
-                self.preload[image] = visual.ImageStim(Window._window, {
+                self.preload[image] = Window.create_stimulus("ImageStim", {
                         **visual_spec,
                         "image": image,
                     })
@@ -280,10 +464,10 @@ class ImageComponent(VisualComponent):
             if (image := visual_spec["image"]) in self.preload:
                 self.component = self.preload[image]
             else:
-                self.component = visual.ImageStim(Window._window, **visual_spec)
+                self.component = Window.create_stimulus("ImageStim", visual_spec)
                 self.preload[image] = self.component
         else:
-            self.component = visual.ImageStim(Window._window, **visual_spec)
+            self.component = Window.create_stimulus("ImageStim", visual_spec)
 
     def prepare(self, trial_values: dict) -> None:
         if "image" in trial_values and self.preload:
@@ -309,7 +493,7 @@ class ShapeComponent(VisualComponent):
         visual_spec["size"] = Window.pix2norm_size(visual_spec["size"])
         
         if hasattr(visual, self.type):
-            self.component = getattr(visual, self.type)(Window._window, **visual_spec)
+            self.component = Window.create_stimulus(self.type, visual_spec)
         else:
             fatal_exit(f"No component named {type}")
     
@@ -2,6 +2,12 @@ from psychopy import constants
 
 # Window constants
 FRAMETOLERANCE = 0.001
+# Frame period used to convert frames to seconds before a window is started
+NOMINAL_FRAME_PERIOD = 1 / 60
+# Time before the next flip at which deferred after-flip work stops
+AFTER_FLIP_MARGIN = 0.002
+# Pixels captured around the stimuli of a cached layer, for antialiased edges
+LAYER_CAPTURE_MARGIN = 2
 
 # Component indicators
 VISUAL = 0
@@ -19,5 +25,52 @@ FINISHED = constants.FINISHED
 NOT_STARTED = constants.NOT_STARTED
 STARTED = constants.STARTED
 
+# Stimulus pools
+STIMULUS_POOL_CAP = 64
+
+# Asset loading
+ASSET_UPLOAD_BATCH = 8
+
+# Buffered input
+INPUT_BUFFER_CAPACITY = 256
+# Seconds between polls of the input collector thread
+INPUT_POLL_INTERVAL = 0.001
+
+# Response box polls per second
+RESPONSE_BOX_POLL_RATE = 2000
+RESPONSE_BOX_MIN_POLL_RATE = 1000
+
+# Response latencies, and their percentiles in the per-block latency summaries
+RESPONSE_LATENCIES = ("latency_poll", "latency_flip", "latency_total")
+RESPONSE_LATENCY_PERCENTILES = (50, 90, 99)
+
+# Mouse trajectories
+# Longest trajectory recorded by a response component without a stop time, in seconds
+MOUSE_TRAJECTORY_MAX_DURATION = 10.0
+# Distance from the start position, in window units, that counts as starting to move
+MOUSE_MOVE_THRESHOLD = 0.01
+
+# Number of measured EMG marker pulse widths to keep
+MARKER_PULSE_HISTORY = 1024
+
+# Frame recording
+FRAME_RECORDER_CAPACITY = 4096
+
+# Data columns written with their own type instead of as escaped text
+TYPED_DATA_COLUMNS = frozenset(
+    ["onset_error_frames", "offset_error_frames", "dropped_frames"]
+)
+# Columns of the per-block latency summary rows, which also keep their type
+LATENCY_SUMMARY_COLUMNS = frozenset(
+    [
+        "latency_summary.responses",
+        *(
+            f"latency_summary.{latency}_p{percentile}"
+            for latency in RESPONSE_LATENCIES
+            for percentile in RESPONSE_LATENCY_PERCENTILES
+        ),
+    ]
+)
+
 # Math
 INFINITY = float("inf")
@@ -1,13 +1,34 @@
-from psychopy.clock import StaticPeriod
+import queue
+import threading
+import time
+from collections import deque
+
+from psychopy import clock
 from psychopy.parallel import ParallelPort
 
+from conflict_task.constants import MARKER_PULSE_HISTORY
 from conflict_task.util import fatal_exit
 
+from .wait_scheduler import WaitScheduler
+
 
 class EMGConnector:
+    """
+    Sends EMG markers on the data pins of the parallel port.
+
+    `send_marker` blocks for the whole pulse. `send_marker_async` sets the pins right away and
+    returns, and a worker thread resets them once the pulse width has passed. A marker sent
+    while another pulse is still on is set by the worker after that pulse and its gap, so
+    pulses never overlap. The measured width of each pulse is kept in `pulse_widths`.
+    """
+
     PORT_ADDRESS = 0x378
     _connected = False
-    ISI = StaticPeriod()
+    pulse_widths: deque = deque(maxlen=MARKER_PULSE_HISTORY)
+    _queue: queue.Queue = queue.Queue()
+    _lock: threading.Lock = threading.Lock()
+    _in_flight: int = 0
+    _worker: threading.Thread = None
 
     @classmethod
     def connect(cls, force=False) -> None:
@@ -54,18 +75,92 @@ class EMGConnector:
 
     @classmethod
     def send_marker(cls, marker, t=0.005, t_before=0.0, t_after=0.0):
-        if t_before > 0.0:
-            cls.ISI.start(t_before)
-            cls.ISI.complete()
-        cls.ISI.start(t)
+        cls.flush()
+        WaitScheduler.wait(t_before)
+        start = clock.getTime()
         cls._set_data(marker)
-        cls.ISI.complete()
-        cls.ISI.start(t)
+        WaitScheduler.wait_until(start + t)
+        start = clock.getTime()
         cls._set_data(0)
-        cls.ISI.complete()
-        if t_after > 0.0:
-            cls.ISI.start(t_after)
-            cls.ISI.complete()
+        WaitScheduler.wait_until(start + t)
+        WaitScheduler.wait(t_after)
+
+    @classmethod
+    def send_marker_async(cls, marker, t=0.005):
+        """
+        Sends `marker` as a pulse of `t` seconds without waiting for it.
+
+        Args:
+
+            `marker`    (int): Value to set on the data pins.
+
+            `t`       (float): Pulse width, and the gap kept before the next marker.
+        """
+
+        if cls._worker is None:
+            cls._worker = threading.Thread(
+                target=cls._run_worker, name="EMGConnector", daemon=True
+            )
+            cls._worker.start()
+
+        with cls._lock:
+            if cls._in_flight:
+                start = None
+            else:
+                start = clock.getTime()
+                cls._set_data(marker)
+            cls._in_flight += 1
+
+        cls._queue.put((marker, t, start))
+
+    @classmethod
+    def _wait_until(cls, target: float) -> None:
+        # Like `WaitScheduler.wait_until`, but spins with the GIL released so the frame loop keeps running
+        while (remaining := target - clock.getTime()) > WaitScheduler.spin_margin:
+            time.sleep(remaining - WaitScheduler.spin_margin)
+
+        while clock.getTime() < target:
+            time.sleep(0)
+
+    @classmethod
+    def _run_worker(cls) -> None:
+        while (pulse := cls._queue.get()) is not None:
+            marker, t, start = pulse
+            if start is None:
+                start = clock.getTime()
+                cls._set_data(marker)
+
+            cls._wait_until(start + t)
+            end = clock.getTime()
+            cls._set_data(0)
+            cls.pulse_widths.append(end - start)
+
+            cls._wait_until(end + t)
+            with cls._lock:
+                cls._in_flight -= 1
+            cls._queue.task_done()
+
+        cls._queue.task_done()
+
+    @classmethod
+    def flush(cls) -> None:
+        """
+        Waits until every marker sent with `send_marker_async` is done.
+        """
+
+        if cls._worker is not None:
+            cls._queue.join()
+
+    @classmethod
+    def stop(cls) -> None:
+        """
+        Finishes the markers in flight and stops the worker thread.
+        """
+
+        if cls._worker is not None:
+            cls._queue.put(None)
+            cls._worker.join()
+            cls._worker = None
 
     @classmethod
     def connected(cls):
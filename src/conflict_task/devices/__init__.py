@@ -1,4 +1,10 @@
+from .asset_loader import AssetLoader
+from .buffered_keyboard import BufferedKeyboard
 from .data_handler import DataHandler
 from .EMG_connector import EMGConnector
-from .input_device import InputDevice, Keyboard
+from .input_device import INPUT_DEVICES, InputDevice, Keyboard
+from .response_box import ResponseBox
+from .simulated_participant import SimulatedParticipant
+from .unit_converter import UnitConverter
+from .wait_scheduler import WaitScheduler
 from .window import Window
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from PIL import Image
+
+from conflict_task.constants import ASSET_UPLOAD_BATCH
+
+
+def decode_image(path: str) -> Image.Image:
+    """
+    Decodes the image file at `path` into memory. Runs in a worker.
+
+    The image is kept as a PIL image rather than a numpy array. `ImageStim` takes arrays as
+    float intensities from -1 to 1, stored bottom row first, and sizes them without their
+    pixel dimensions, so an array would need four times the memory and its own size and
+    orientation handling. A PIL image is uploaded as bytes at its own size, like an image file.
+    """
+
+    with Image.open(path) as picture:
+        return picture.convert("RGBA")
+
+
+class AssetLoader:
+    """
+    Decodes image files in the background and hands them to the main thread in batches.
+
+    Decoding runs on a thread pool, or a process pool for large sets, since it does not touch
+    OpenGL. Stimuli are created from the decoded images by `upload`, on the main thread, in
+    batches small enough to fit between instruction screens. `finish` uploads whatever is left.
+    """
+
+    workers: int = None
+    processes: bool = False
+    uploaded: int = 0
+    _executor: Executor = None
+    _pending: deque = deque()
+
+    @classmethod
+    def configure(cls, workers: int = None, processes: bool = False) -> None:
+        """
+        Sets up the worker pool used by later loads.
+
+        Args:
+
+            `workers`       (int): Number of workers. Defaults to the executor's own default.
+
+            `processes`    (bool): Decode in worker processes instead of threads.
+        """
+
+        cls.shutdown()
+        cls.workers = workers
+        cls.processes = processes
+
+    @classmethod
+    def load(cls, path: str, on_decoded: Callable[[Image.Image], None]) -> None:
+        """
+        Starts decoding `path`. `on_decoded` is called with the decoded image on the main thread by `upload`.
+        """
+
+        if cls._executor is None:
+            executor_class = (
+                ProcessPoolExecutor if cls.processes else ThreadPoolExecutor
+            )
+            cls._executor = executor_class(max_workers=cls.workers)
+
+        cls._pending.append((cls._executor.submit(decode_image, path), on_decoded))
+
+    @classmethod
+    def pending(cls) -> int:
+        return len(cls._pending)
+
+    @classmethod
+    def upload(cls, batch_size: int = ASSET_UPLOAD_BATCH, block: bool = False) -> int:
+        """
+        Hands up to `batch_size` decoded images to their callbacks, in the order they were loaded.
+
+        Args:
+
+            `batch_size`    (int): Most images to hand over.
+
+            `block`        (bool): Wait for images that are still decoding. Otherwise stops at the first one.
+
+        Returns:
+
+            Number of images handed over (int).
+        """
+
+        uploaded = 0
+        while cls._pending and uploaded < batch_size:
+            future, on_decoded = cls._pending[0]
+            if not block and not future.done():
+                break
+            cls._pending.popleft()
+            on_decoded(future.result())
+            uploaded += 1
+
+        cls.uploaded += uploaded
+        return uploaded
+
+    @classmethod
+    def finish(cls) -> None:
+        """
+        Waits for every load and uploads it.
+        """
+
+        while cls._pending:
+            cls.upload(batch_size=len(cls._pending), block=True)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        cls.finish()
+        if cls._executor is not None:
+            cls._executor.shutdown()
+            cls._executor = None
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from psychopy import logging
+from psychopy.hardware import keyboard
+
+from conflict_task.constants import INPUT_BUFFER_CAPACITY, INPUT_POLL_INTERVAL
+
+from .input_device import INPUT_DEVICES, InputDeviceBase
+from .key_ring import KeyRing
+
+
+class BufferedKeyboard(InputDeviceBase):
+    """
+    Keyboard whose presses are collected into a preallocated `KeyRing`.
+
+    A collector thread drains the device every `poll_interval` seconds and writes each press
+    to the ring. Readers only look at records written since the oldest record that has not
+    been cleared, so a check costs the same on every frame no matter how many keys are asked
+    for. `InputDevice` reads the ring directly instead of copying the presses.
+
+    Draining the device and reading its clock's reset time happen under one lock, which
+    `reset_clock` also takes, so a reset cannot land between them and shift press times.
+    If the ring fills up, unread presses are overwritten; each time that happens it is
+    logged, and the total is kept in `ring.overflows`.
+
+    The collector only runs in a thread with the psychtoolbox backend, whose key queue is
+    filled outside the main thread. With the event backend, the device is drained by the
+    reading thread instead.
+    """
+
+    capacity: int = INPUT_BUFFER_CAPACITY
+    poll_interval: float = INPUT_POLL_INTERVAL
+    ring: KeyRing = KeyRing(INPUT_BUFFER_CAPACITY)
+    _clock_lock: threading.Lock = threading.Lock()
+    _thread: threading.Thread = None
+    _running: bool = False
+
+    @classmethod
+    def start(cls, device=None, threaded: bool = None) -> None:
+        """
+        Opens the device and starts the collector.
+
+        Args:
+
+            `device`            : Device with a PsychoPy style `getKeys(clear=True)` and `clock`. Defaults to a `psychopy.hardware.keyboard.Keyboard`.
+
+            `threaded`  (bool)  : Collect in a thread. Defaults to whether the psychtoolbox backend is in use.
+        """
+
+        cls.stop()
+
+        cls._device = device if device is not None else keyboard.Keyboard()
+        cls.ring = KeyRing(cls.capacity)
+
+        if threaded is None:
+            threaded = keyboard.havePTB
+
+        if threaded:
+            cls._running = True
+            cls._thread = threading.Thread(
+                target=cls._run_collector, name="BufferedKeyboard", daemon=True
+            )
+            cls._thread.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        cls._running = False
+        if cls._thread is not None:
+            cls._thread.join()
+            cls._thread = None
+
+    @classmethod
+    def _run_collector(cls) -> None:
+        while cls._running:
+            cls._collect()
+            time.sleep(cls.poll_interval)
+
+    @classmethod
+    def _collect(cls) -> None:
+        if cls._device is None:
+            cls.start()
+
+        # Press times are kept in absolute time, so that they survive clock resets.
+        # Response times are relative to the reset time read together with them
+        with cls._clock_lock:
+            keys_pressed = cls._device.getKeys(clear=True)
+            time_at_reset = cls._device.clock.getLastResetTime()
+        if not keys_pressed:
+            return
+
+        overflows = cls.ring.overflows
+        for key in keys_pressed:
+            cls.ring.append(key.name, key.rt + time_at_reset)
+
+        if cls.ring.overflows > overflows:
+            logging.warning(
+                f"BufferedKeyboard: {cls.ring.overflows - overflows} unread key presses "
+                f"overwritten, the buffer holds {cls.ring.capacity}"
+            )
+
+    @classmethod
+    def collect(cls) -> None:
+        if not cls._running:
+            cls._collect()
+
+    @classmethod
+    def get_reset_time(cls) -> float:
+        if cls._device is None:
+            cls.start()
+        return cls._device.clock.getLastResetTime()
+
+    @classmethod
+    def get_keys(
+        cls, keys: list[str], wait_for_release=False, clear=True
+    ) -> list[tuple[str, float]]:
+        cls.collect()
+        return cls.ring.get_keys(keys, clear, cls.get_reset_time())
+
+    @classmethod
+    def get_last_key(cls, keys: list[str]) -> tuple[str, float]:
+        cls.collect()
+        return cls.ring.get_last_key(keys, True, cls.get_reset_time())
+
+    @classmethod
+    def was_key_pressed(cls, keys, clear=False) -> bool:
+        cls.collect()
+        return cls.ring.get_last_key(keys, clear) is not None
+
+    @classmethod
+    def reset_clock(cls, new_t=0.0) -> None:
+        if cls._device is None:
+            cls.start()
+        with cls._clock_lock:
+            cls._device.clock.reset(new_t)
+
+    @classmethod
+    def get_time(cls) -> float:
+        if cls._device is None:
+            cls.start()
+        return cls._device.clock.getTime()
+
+    @classmethod
+    def reset_events(cls) -> None:
+        cls.collect()
+        cls.ring.clear()
+
+
+INPUT_DEVICES["BufferedKeyboard"] = BufferedKeyboard
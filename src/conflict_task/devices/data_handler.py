@@ -2,8 +2,12 @@ from pathlib import Path
 
 from psychopy import __version__, core, data, gui
 
+from conflict_task.constants import LATENCY_SUMMARY_COLUMNS, TYPED_DATA_COLUMNS
+
 
 class DataHandler:
+    typed_columns: frozenset = TYPED_DATA_COLUMNS
+    typed_keys: frozenset = LATENCY_SUMMARY_COLUMNS
     filename: str = None
     subject_info: dict = None
     new_entry: bool = True
@@ -82,7 +86,15 @@ class DataHandler:
     @classmethod
     def add_data_dict(cls, data_dict: dict):
         for key, value in data_dict.items():
-            cls.add_data(str(key), str(value).encode("unicode_escape").decode())
+            key = str(key)
+            # Columns in `typed_columns` keep their type whatever the prefix of the key,
+            # and those in `typed_keys` only under their full key
+            if (
+                key not in cls.typed_keys
+                and key.rpartition(".")[2] not in cls.typed_columns
+            ):
+                value = str(value).encode("unicode_escape").decode()
+            cls.add_data(key, value)
 
     @classmethod
     def add_data_dict_and_next_entry(cls, data_dict: dict):
@@ -4,9 +4,13 @@ from psychopy.hardware import keyboard
 
 from conflict_task.util import *
 
+from .key_ring import KeyRing
+
 
 class InputDeviceBase:
     _device = None
+    ring: KeyRing = None
+    """Ring buffer the device writes its presses to, if it keeps one."""
 
     @classmethod
     def _use_derived_classes(cls):
@@ -33,10 +37,51 @@ class InputDeviceBase:
     def reset_clock(cls, new_t=0.0) -> None:
         cls._use_derived_classes()
 
+    @classmethod
+    def get_time(cls) -> float:
+        """
+        Returns the time on the clock that response times are measured on.
+        """
+        cls._use_derived_classes()
+
     @classmethod
     def reset_events(cls) -> None:
         cls._use_derived_classes()
 
+    @classmethod
+    def collect(cls) -> None:
+        """
+        Writes pending presses to `ring`. Does nothing unless the device keeps a ring and no thread fills it.
+        """
+
+    @classmethod
+    def get_reset_time(cls) -> float:
+        """
+        Returns the time subtracted from the press times in `ring` to give response times.
+        """
+        return 0.0
+
+    @classmethod
+    def start(cls) -> None:
+        """
+        Called when the device is selected. Does nothing unless a device needs to open or start a thread.
+        """
+
+    @classmethod
+    def prepare(cls, trial_values: dict) -> None:
+        """
+        Called with each sequence's trial values before it runs. Does nothing unless a device needs them.
+        """
+
+    @classmethod
+    def open_response_window(
+        cls, keys: list[str], correct_key: str = None, onset: float = None
+    ) -> None:
+        """
+        Called when a response component starts, with its keys, the correct key if known
+        and the flip time the window opens on. Does nothing unless a device needs it.
+        """
+
 
 """
 class Keyboard(InputDevice):
@@ -111,6 +156,10 @@ class Keyboard(InputDeviceBase):
     def reset_clock(cls, new_t=0.0) -> None:
         cls._device.clock.reset(new_t)
 
+    @classmethod
+    def get_time(cls) -> float:
+        return cls._device.clock.getTime()
+
     @classmethod
     def reset_events(cls) -> None:
         cls._device.clearEvents()
@@ -120,41 +169,119 @@ INPUT_DEVICES = {"Keyboard": Keyboard}
 
 
 class InputDevice:
+    """
+    Front for the selected input device.
+
+    Presses are read from a ring buffer: the device's own `ring` if it keeps one, or else a
+    ring here that `poll` drains the device into. Consumers read the ring by position, so the
+    quit check, a response component and the post-response log all see the same presses, and
+    none of them can clear a press another one still needs.
+
+    The frame loop polls once per frame and reads with `poll=False`, which only scans the
+    records written since the previous poll. Other reads poll first and scan every record
+    that has not been cleared.
+    """
+
     instance = Keyboard
+    polls: int = 0
+    ring: KeyRing = KeyRing()
+    _ring: KeyRing = ring
+    _cursor: int = 0
+    _poll_start: int = 0
 
     @classmethod
     def select(cls, input_device: InputDeviceBase):
         try:
             if isinstance(input_device, str):
                 input_device = INPUT_DEVICES[input_device]
-            if isinstance(input_device, InputDeviceBase):
+            if isinstance(input_device, type) and issubclass(
+                input_device, InputDeviceBase
+            ):
                 cls.instance = input_device
+                input_device.start()
+                cls._ring = (
+                    input_device.ring if input_device.ring is not None else cls.ring
+                )
+                cls._clear()
             else:
                 raise ValueError
         except (KeyError, ValueError):
             fatal_exit(
                 f"{input_device} is not a valid input device. "
-                "Please select any of the following {INPUT_DEVICES}"
+                f"Please select any of the following {list(INPUT_DEVICES)}"
             )
 
+    @classmethod
+    def _clear(cls) -> None:
+        cls._ring.clear()
+        cls._cursor = cls._poll_start = cls._ring.write
+
+    @classmethod
+    def _get_reset_time(cls) -> float:
+        # Presses drained into the ring here already are response times
+        return 0.0 if cls._ring is cls.ring else cls.instance.get_reset_time()
+
+    @classmethod
+    def poll(cls) -> None:
+        """
+        Reads the device once, and marks the records written since the previous poll as new.
+        """
+
+        if cls._ring is cls.ring:
+            for key, rt in cls.instance.get_keys([]):
+                cls.ring.append(key, rt)
+        else:
+            cls.instance.collect()
+
+        cls._poll_start, cls._cursor = cls._cursor, cls._ring.write
+        cls.polls += 1
+
+    @classmethod
+    def _get_start(cls, poll: bool) -> int:
+        if poll:
+            cls.poll()
+            return None
+        return cls._poll_start
+
     @classmethod
     def get_keys(
-        cls, keys: list[str], wait_for_release=False, clear=True
+        cls, keys: list[str], wait_for_release=False, clear=True, poll=True
     ) -> list[tuple[str, float]]:
-        return cls.instance.get_keys(keys, wait_for_release, clear)
+        if wait_for_release:
+            return cls.instance.get_keys(keys, wait_for_release, clear)
+
+        start = cls._get_start(poll)
+        return cls._ring.get_keys(keys, clear, cls._get_reset_time(), start)
 
     @classmethod
-    def get_last_key(cls, keys: list[str]) -> tuple[str, float]:
-        return cls.instance.get_last_key(keys)
+    def get_last_key(cls, keys: list[str], poll=True) -> tuple[str, float]:
+        start = cls._get_start(poll)
+        return cls._ring.get_last_key(keys, True, cls._get_reset_time(), start)
 
     @classmethod
-    def was_key_pressed(cls, keys, clear=False) -> bool:
-        return cls.instance.was_key_pressed(keys, clear)
+    def was_key_pressed(cls, keys, clear=False, poll=True) -> bool:
+        start = cls._get_start(poll)
+        return cls._ring.get_last_key(keys, clear, start=start) is not None
 
     @classmethod
     def reset_clock(cls, new_t=0.0) -> None:
         cls.instance.reset_clock(new_t)
 
+    @classmethod
+    def get_time(cls) -> float:
+        return cls.instance.get_time()
+
     @classmethod
     def reset_events(cls) -> None:
         cls.instance.reset_events()
+        cls._clear()
+
+    @classmethod
+    def prepare(cls, trial_values: dict) -> None:
+        cls.instance.prepare(trial_values)
+
+    @classmethod
+    def open_response_window(
+        cls, keys: list[str], correct_key: str = None, onset: float = None
+    ) -> None:
+        cls.instance.open_response_window(keys, correct_key, onset)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from conflict_task.constants import INPUT_BUFFER_CAPACITY
+
+CONSUMED = -1
+
+
+class KeyRing:
+    """
+    Preallocated ring buffer of `(key code, press time)` records.
+
+    One thread writes records with `append`, and readers scan positions between a cursor and
+    `write`. Clearing a record marks it as consumed, and `read` moves past the consumed records
+    at the start, so scans from `read` only cover records nobody has cleared yet. Key names
+    are matched through cached sets of codes.
+
+    If the writer laps a record that has not been cleared, the record is lost and counted in
+    `overflows`.
+    """
+
+    def __init__(self, capacity: int = INPUT_BUFFER_CAPACITY) -> None:
+        self.capacity: int = capacity
+        """Number of records the ring holds."""
+
+        self.codes: np.ndarray = np.full(capacity, CONSUMED, dtype=np.int32)
+        """Key code per record, or `CONSUMED`."""
+
+        self.times: np.ndarray = np.zeros(capacity, dtype=np.float64)
+        """Press time per record."""
+
+        self.write: int = 0
+        """Position of the next record. Only the writer changes it."""
+
+        self.read: int = 0
+        """Position of the oldest record that may not have been cleared."""
+
+        self.overflows: int = 0
+        """Number of records overwritten before they were cleared."""
+
+        self._key_codes: dict[str, int] = {}
+        self._key_names: list[str] = []
+        self._key_sets: dict[tuple, frozenset] = {}
+        self._key_lock: threading.Lock = threading.Lock()
+
+    def get_code(self, name: str) -> int:
+        if (code := self._key_codes.get(name)) is None:
+            # New key names can come from the writer and from readers at the same time
+            with self._key_lock:
+                if (code := self._key_codes.get(name)) is None:
+                    self._key_names.append(name)
+                    code = self._key_codes[name] = len(self._key_names) - 1
+        return code
+
+    def get_key_set(self, keys) -> frozenset:
+        """
+        Returns the codes of `keys`. An empty set matches every key.
+        """
+
+        if isinstance(keys, str):
+            keys = [keys]
+        keys = tuple(keys)
+
+        if (key_set := self._key_sets.get(keys)) is None:
+            key_set = self._key_sets[keys] = frozenset(
+                self.get_code(key) for key in keys
+            )
+        return key_set
+
+    def append(self, name: str, time: float) -> None:
+        index = self.write % self.capacity
+        if self.write - self.read >= self.capacity and self.codes[index] != CONSUMED:
+            self.overflows += 1
+
+        self.codes[index] = self.get_code(name)
+        self.times[index] = time
+        # Publish the record only once it is complete
+        self.write += 1
+
+    def clear(self) -> None:
+        """
+        Clears every record written so far.
+        """
+
+        self.read = self.write
+
+    def _get_start(self, start: int) -> int:
+        return max(start, self.read, self.write - self.capacity)
+
+    def _advance_read(self, end: int) -> None:
+        read = max(self.read, end - self.capacity)
+        while read < end and self.codes[read % self.capacity] == CONSUMED:
+            read += 1
+        self.read = read
+
+    def get_keys(
+        self,
+        keys: list[str],
+        clear: bool = True,
+        time_at_reset: float = 0.0,
+        start: int = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Returns the `(key, time)` records of `keys` that have not been cleared.
+
+        Args:
+
+            `keys`           (list): Keys to match. An empty list matches every key.
+
+            `clear`          (bool): Clear the matched records.
+
+            `time_at_reset` (float): Subtracted from the stored press times.
+
+            `start`           (int): Only scan from this position. Defaults to `read`.
+        """
+
+        end = self.write
+        position = self._get_start(self.read if start is None else start)
+        if position >= end:
+            return []
+
+        key_set = self.get_key_set(keys)
+        codes, capacity = self.codes, self.capacity
+        keys_pressed = []
+        for position in range(position, end):
+            index = position % capacity
+            code = int(codes[index])
+            if code == CONSUMED or (key_set and code not in key_set):
+                continue
+
+            keys_pressed.append(
+                (self._key_names[code], float(self.times[index]) - time_at_reset)
+            )
+            if clear:
+                codes[index] = CONSUMED
+
+        if clear and keys_pressed:
+            self._advance_read(end)
+        return keys_pressed
+
+    def get_last_key(
+        self,
+        keys: list[str],
+        clear: bool = True,
+        time_at_reset: float = 0.0,
+        start: int = None,
+    ) -> tuple[str, float]:
+        """
+        Returns the last `(key, time)` record of `keys` that has not been cleared, or None.
+
+        Takes the same arguments as `get_keys`, and clears every matched record if `clear`.
+        """
+
+        end = self.write
+        position = self._get_start(self.read if start is None else start)
+        if position >= end:
+            return None
+
+        key_set = self.get_key_set(keys)
+        codes, capacity = self.codes, self.capacity
+        last_code = last_index = None
+        for position in range(position, end):
+            index = position % capacity
+            code = int(codes[index])
+            if code == CONSUMED or (key_set and code not in key_set):
+                continue
+
+            last_code, last_index = code, index
+            if clear:
+                codes[index] = CONSUMED
+
+        if last_code is None:
+            return None
+
+        if clear:
+            self._advance_read(end)
+        return (
+            self._key_names[last_code],
+            float(self.times[last_index]) - time_at_reset,
+        )
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+from psychopy import clock, logging
+from psychopy.parallel import ParallelPort
+
+from conflict_task.constants import RESPONSE_BOX_MIN_POLL_RATE, RESPONSE_BOX_POLL_RATE
+from conflict_task.util import *
+
+from .EMG_connector import EMGConnector
+from .input_device import INPUT_DEVICES, InputDeviceBase, Keyboard
+from .key_ring import KeyRing
+
+# Status pins of the parallel port, and the key each button reports as
+DEFAULT_RESPONSE_BOX_BUTTONS = {10: "f", 11: "j"}
+
+
+class FakeParallelPort:
+    """
+    Stand-in for a `ParallelPort` whose pins are set by hand, for testing without hardware.
+    """
+
+    def __init__(self, levels: dict[int, int] = {}) -> None:
+        self.levels: dict[int, int] = dict(levels)
+
+    def readPin(self, pin: int) -> int:
+        return self.levels.get(pin, 0)
+
+    def set_pin(self, pin: int, level: int) -> None:
+        self.levels[pin] = level
+
+
+class ResponseBox(InputDeviceBase):
+    """
+    Response box whose buttons are wired to the status pins of a parallel port.
+
+    A polling thread reads the button pins `rate` times per second. A button press is the
+    edge from a pin's resting level, read when the device starts, to the other level. Presses
+    are timestamped on the `Keyboard` clock, so response times from the box and the keyboard
+    can be compared, and reported under the key names in `buttons`, so response components
+    do not need to know about the box. The thread writes presses to a `KeyRing`, which
+    `InputDevice` reads directly.
+
+    Sleeping cannot hold 1 kHz, so the thread spins between polls, releasing the GIL on
+    every turn so the frame loop keeps running. While it runs, the interpreter's switch
+    interval is lowered below the poll interval, so the frame loop cannot hold the GIL for
+    several polls. The rate achieved is kept in `achieved_rate` and logged when the device
+    stops.
+
+    The port is the one `EMGConnector` is connected to, if any, since markers go out on the
+    data pins and buttons come in on the status pins.
+    """
+
+    buttons: dict[int, str] = DEFAULT_RESPONSE_BOX_BUTTONS
+    rate: float = RESPONSE_BOX_POLL_RATE
+    port = None
+    polls: int = 0
+    achieved_rate: float = None
+    _clock: clock.Clock = Keyboard._device.clock
+    _started: float = None
+    _switch_interval: float = None
+    ring: KeyRing = KeyRing()
+    _resting: dict[int, int] = {}
+    _thread: threading.Thread = None
+    _running: bool = False
+
+    @classmethod
+    def configure(
+        cls, buttons: dict[int, str] = None, rate: float = None, port=None
+    ) -> None:
+        """
+        Sets the button wiring, polling rate and port used when the device starts.
+
+        Args:
+
+            `buttons`   (dict): Key name for each status pin with a button. Defaults to `DEFAULT_RESPONSE_BOX_BUTTONS`.
+
+            `rate`     (float): Polls per second. Defaults to `RESPONSE_BOX_POLL_RATE`.
+
+            `port`            : Object with a `readPin(pin)` method, e.g. a `FakeParallelPort`. Defaults to the parallel port.
+        """
+
+        cls.stop()
+
+        if buttons is not None:
+            true_or_fatal_exit(
+                all(pin in (10, 11, 12, 13, 15) for pin in buttons),
+                f"ResponseBox: Buttons must be on status pins 10, 11, 12, 13 or 15, not {list(buttons)}",
+            )
+            cls.buttons = {int(pin): key for pin, key in buttons.items()}
+        if rate is not None:
+            true_or_fatal_exit(
+                rate >= RESPONSE_BOX_MIN_POLL_RATE,
+                f"ResponseBox: Polling rate must be at least {RESPONSE_BOX_MIN_POLL_RATE} Hz",
+            )
+            cls.rate = rate
+        cls.port = port
+
+    @classmethod
+    def _open_port(cls) -> None:
+        if EMGConnector.connected():
+            cls.port = EMGConnector.port
+            return
+
+        try:
+            cls.port = ParallelPort(address=EMGConnector.PORT_ADDRESS)
+        except (TypeError, OSError):
+            fatal_exit("ResponseBox requested but no ParallelPort connection made")
+
+    @classmethod
+    def start(cls) -> None:
+        cls.stop()
+        if cls.port is None:
+            cls._open_port()
+
+        cls._resting = {pin: cls.port.readPin(pin) for pin in cls.buttons}
+        cls.reset_events()
+        cls.polls = 0
+        cls._started = time.perf_counter()
+
+        cls._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(cls._switch_interval, 0.5 / cls.rate))
+
+        cls._running = True
+        cls._thread = threading.Thread(
+            target=cls._run_poller, name="ResponseBox", daemon=True
+        )
+        cls._thread.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        cls._running = False
+        if cls._thread is None:
+            return
+
+        cls._thread.join()
+        cls._thread = None
+        sys.setswitchinterval(cls._switch_interval)
+
+        cls.achieved_rate = cls.get_rate()
+        message = f"ResponseBox: Polled at {cls.achieved_rate:.0f} Hz"
+        if cls.achieved_rate < RESPONSE_BOX_MIN_POLL_RATE:
+            logging.warning(f"{message}, below {RESPONSE_BOX_MIN_POLL_RATE} Hz")
+        else:
+            logging.info(message)
+
+    @classmethod
+    def get_rate(cls) -> float:
+        """
+        Returns the polls per second achieved since the device started.
+        """
+
+        if cls._started is None:
+            return 0.0
+        return cls.polls / max(time.perf_counter() - cls._started, 1e-9)
+
+    @classmethod
+    def _run_poller(cls) -> None:
+        port = cls.port
+        interval = 1.0 / cls.rate
+        pressed = {pin: False for pin in cls.buttons}
+
+        next_poll = cls._started
+        while cls._running:
+            # Raw time on the timebase of the Keyboard clock, made relative to its last reset when read
+            now = clock.getTime()
+            for pin, key in cls.buttons.items():
+                is_pressed = port.readPin(pin) != cls._resting[pin]
+                if is_pressed and not pressed[pin]:
+                    cls.ring.append(key, now)
+                pressed[pin] = is_pressed
+            cls.polls += 1
+
+            # Polls are scheduled from the previous deadline, so the rate holds on average
+            next_poll += interval
+            if next_poll < time.perf_counter():
+                next_poll = time.perf_counter()
+            while time.perf_counter() < next_poll:
+                time.sleep(0)
+
+    @classmethod
+    def get_reset_time(cls) -> float:
+        return cls._clock.getLastResetTime()
+
+    @classmethod
+    def get_keys(
+        cls, keys: list[str], wait_for_release=False, clear=True
+    ) -> list[tuple[str, float]]:
+        return cls.ring.get_keys(keys, clear, cls.get_reset_time())
+
+    @classmethod
+    def get_last_key(cls, keys: list[str]) -> tuple[str, float]:
+        return cls.ring.get_last_key(keys, True, cls.get_reset_time())
+
+    @classmethod
+    def was_key_pressed(cls, keys, clear=False) -> bool:
+        return cls.ring.get_last_key(keys, clear) is not None
+
+    @classmethod
+    def reset_clock(cls, new_t=0.0) -> None:
+        cls._clock.reset(new_t)
+
+    @classmethod
+    def get_time(cls) -> float:
+        return cls._clock.getTime()
+
+    @classmethod
+    def reset_events(cls) -> None:
+        cls.ring.clear()
+
+
+INPUT_DEVICES["ResponseBox"] = ResponseBox
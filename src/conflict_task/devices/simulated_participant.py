@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import numpy as np
+from psychopy import clock
+
+from conflict_task.util import *
+
+from .input_device import INPUT_DEVICES, InputDeviceBase
+
+DEFAULT_PARTICIPANT_MODEL = dict(
+    # Ex-Gaussian response time: mean (mu) and standard deviation (sigma) of the Gaussian part...
+    mu=0.45,
+    sigma=0.05,
+    # ...and mean of the exponential tail (tau)
+    tau=0.1,
+    # Trial value that is truthy on incongruent trials
+    incongruent_factor="congruency",
+    # Added response time on incongruent trials
+    congruency_effect=0.05,
+    # Probability of pressing a wrong key on congruent and incongruent trials
+    error_rate=0.05,
+    error_rate_incongruent=0.1,
+    # Probability of not responding at all
+    miss_rate=0.0,
+)
+
+
+class SimulatedParticipant(InputDeviceBase):
+    """
+    Input device that presses keys on behalf of a simulated participant.
+
+    When a response window opens, a key press is drawn either from a script or from a
+    statistical model, and it is timestamped on the device clock the same way `Keyboard`
+    timestamps presses. The press becomes visible to `get_keys` once the device clock
+    reaches its time.
+
+    The model draws ex-Gaussian response times, slowed by `congruency_effect` on
+    incongruent trials, and presses a wrong key with the given error rates. A script is
+    a list of `(key, rt)` tuples, or `None` for no response, used one per response window.
+    An `rt` is counted from the onset of the response window.
+    """
+
+    _clock: clock.Clock = clock.Clock()
+    model: dict = DEFAULT_PARTICIPANT_MODEL
+    script: list = None
+    _script_index: int = 0
+    _rng: np.random.Generator = np.random.default_rng()
+    _trial_values: dict = {}
+    _pending: list[tuple[str, float]] = []
+    _events: list[tuple[str, float]] = []
+
+    @classmethod
+    def configure(cls, model: dict = {}, script: list = None, seed: int = None) -> None:
+        """
+        Sets the participant's response model or script.
+
+        Args:
+
+            `model`     (dict): Overrides of `DEFAULT_PARTICIPANT_MODEL`.
+
+            `script`    (list): List of `(key, rt)` tuples or `None`, one per response window.
+            If given, it is used instead of the model.
+
+            `seed`       (int): Seed for the model's random number generator.
+        """
+
+        unknown = set(model) - set(DEFAULT_PARTICIPANT_MODEL)
+        true_or_fatal_exit(
+            not unknown, f"SimulatedParticipant: Unknown model settings {unknown}"
+        )
+
+        cls.model = {**DEFAULT_PARTICIPANT_MODEL, **model}
+        cls.script = script
+        cls._script_index = 0
+        cls._rng = np.random.default_rng(seed)
+        cls._pending = []
+        cls._events = []
+
+    @classmethod
+    def prepare(cls, trial_values: dict) -> None:
+        cls._trial_values = trial_values
+
+    @classmethod
+    def open_response_window(
+        cls, keys: list[str], correct_key: str = None, onset: float = None
+    ) -> None:
+        if onset is None:
+            onset = cls._clock.getTime()
+
+        if cls.script is not None:
+            response = (
+                cls.script[cls._script_index]
+                if cls._script_index < len(cls.script)
+                else None
+            )
+            cls._script_index += 1
+        else:
+            response = cls._draw_response(keys, correct_key)
+
+        if response is not None:
+            key, rt = response
+            cls._pending = [(key, onset + rt)]
+
+    @classmethod
+    def _draw_response(cls, keys: list[str], correct_key: str) -> tuple[str, float]:
+        model = cls.model
+        rng = cls._rng
+
+        if rng.random() < model["miss_rate"]:
+            return None
+
+        incongruent = bool(cls._trial_values.get(model["incongruent_factor"]))
+
+        rt = rng.normal(model["mu"], model["sigma"]) + rng.exponential(model["tau"])
+        if incongruent:
+            rt += model["congruency_effect"]
+
+        if correct_key is None:
+            return keys[0], max(rt, 0.0)
+
+        error_rate = model["error_rate_incongruent" if incongruent else "error_rate"]
+        wrong_keys = [key for key in keys if key != correct_key]
+
+        if wrong_keys and rng.random() < error_rate:
+            key = wrong_keys[rng.integers(len(wrong_keys))]
+        else:
+            key = correct_key
+
+        return key, max(rt, 0.0)
+
+    @classmethod
+    def _release_pending(cls) -> None:
+        if cls._pending:
+            now = cls._clock.getTime()
+            cls._events.extend(press for press in cls._pending if press[1] <= now)
+            cls._pending = [press for press in cls._pending if press[1] > now]
+
+    @classmethod
+    def get_keys(
+        cls, keys: list[str], wait_for_release=False, clear=True
+    ) -> list[tuple[str, float]]:
+        if isinstance(keys, str):
+            keys = [keys]
+
+        cls._release_pending()
+
+        keys_pressed = [event for event in cls._events if not keys or event[0] in keys]
+
+        if clear and keys_pressed:
+            cls._events = [event for event in cls._events if event not in keys_pressed]
+
+        return keys_pressed
+
+    @classmethod
+    def get_last_key(cls, keys: list[str]) -> tuple[str, float]:
+        keys_pressed = cls.get_keys(keys)
+
+        if len(keys_pressed):
+            return keys_pressed[-1]
+        return None
+
+    @classmethod
+    def was_key_pressed(cls, keys, clear=False) -> bool:
+        return bool(len(cls.get_keys(keys, clear=clear)))
+
+    @classmethod
+    def reset_clock(cls, new_t=0.0) -> None:
+        cls._clock.reset(new_t)
+
+    @classmethod
+    def get_time(cls) -> float:
+        return cls._clock.getTime()
+
+    @classmethod
+    def reset_events(cls) -> None:
+        cls._pending = []
+        cls._events = []
+
+
+INPUT_DEVICES["SimulatedParticipant"] = SimulatedParticipant
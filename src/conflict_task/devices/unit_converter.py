@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .window import Window
+
+
+def _value_key(value):
+    return tuple(value) if isinstance(value, (list, tuple, np.ndarray)) else value
+
+
+class UnitConverter:
+    """
+    Cached conversion of pixel and point values to window units.
+
+    Whole columns of trial values are converted at once with `convert_column`, using the
+    vectorized `Window` conversions. Results are cached per conversion and window size, so
+    converting a single value during a trial is a dictionary lookup.
+    """
+
+    _cache: dict = {}
+
+    @classmethod
+    def _get_cache(cls, conversion: str) -> dict:
+        window = Window._window
+        key = (conversion, tuple(window.size), window.useRetina)
+        if (cache := cls._cache.get(key)) is None:
+            cache = cls._cache[key] = {}
+        return cache
+
+    @classmethod
+    def convert_column(cls, conversion: str, values: list) -> None:
+        """
+        Converts every value in `values` with the `Window` conversion named `conversion` and caches the results.
+
+        Args:
+
+            `conversion`    (str): Name of a `Window` conversion, e.g. `pix2norm_size` or `pt2norm_size`.
+
+            `values`       (list): Values to convert. Numbers, pairs of numbers or a mix of both.
+        """
+
+        cache = cls._get_cache(conversion)
+        unique = {
+            _value_key(value): value
+            for value in values
+            if _value_key(value) not in cache
+        }
+
+        # Values of one shape are converted together. Scalars are converted one at a time,
+        # since a conversion can broadcast a scalar against the window size
+        groups: dict[tuple, list] = {}
+        for key, value in unique.items():
+            groups.setdefault(np.shape(value), []).append((key, value))
+
+        for shape, group in groups.items():
+            if not shape:
+                for key, value in group:
+                    cache[key] = getattr(Window, conversion)(
+                        np.array(value, dtype=float)
+                    )
+                continue
+
+            converted = getattr(Window, conversion)(
+                np.array([value for _, value in group], dtype=float)
+            )
+            for (key, _), result in zip(group, converted):
+                cache[key] = result
+
+    @classmethod
+    def convert(cls, conversion: str, value):
+        """
+        Returns `value` converted with the `Window` conversion named `conversion`, from the cache if possible.
+        """
+
+        cache = cls._get_cache(conversion)
+        key = _value_key(value)
+        if (result := cache.get(key)) is None:
+            result = cache[key] = getattr(Window, conversion)(
+                np.array(value, dtype=float)
+            )
+        return result
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._cache = {}
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from psychopy import clock, logging
+
+from .wait_scheduler import WaitScheduler
+
+
+class VirtualStim:
+    """
+    Stand-in for any PsychoPy visual stimulus on a `VirtualWindow`.
+
+    Keeps the settings it is given as attributes and counts its draws on the window.
+    """
+
+    def __init__(self, win: VirtualWindow, stimulus_type: str = None, **spec) -> None:
+        self.win = win
+        self.stimulus_type = stimulus_type
+        self.autoDraw = False
+        self.pos = (0.0, 0.0)
+        self.size = None
+        self.__dict__.update(spec)
+
+    def setAutoDraw(self, value: bool, log=None) -> None:
+        if value and not self.autoDraw:
+            self.win._toDraw.append(self)
+        elif not value and self.autoDraw:
+            self.win._toDraw.remove(self)
+        self.autoDraw = value
+
+    def draw(self, win=None) -> None:
+        self.win.draw_calls += 1
+
+
+class VirtualMouse:
+    """
+    Stand-in for a `psychopy.event.Mouse` on a `VirtualWindow`. It is moved with `setPos`.
+    """
+
+    def __init__(
+        self, win: VirtualWindow = None, visible: bool = True, **settings
+    ) -> None:
+        self.win = win
+        self.visible = visible
+        self.pos = np.zeros(2)
+        self.setVisible(visible)
+
+    def getPos(self) -> np.ndarray:
+        return self.pos
+
+    def getVisible(self) -> bool:
+        return self.visible
+
+    def setVisible(self, visible: bool) -> None:
+        # Like a PsychoPy mouse, the cursor visibility belongs to the window
+        self.visible = visible
+        if self.win is not None:
+            self.win.mouseVisible = visible
+
+    def setPos(self, newPos=(0, 0)) -> None:
+        self.pos = np.array(newPos, dtype=float)
+
+
+class VirtualWindow:
+    """
+    Drop-in replacement for `psychopy.visual.Window` that needs no GPU or display.
+
+    `flip()` follows a simulated vsync at `refresh_rate`, and `getFutureFlipTime` is
+    computed from that same vsync. In real time mode `flip()` waits for the next vsync.
+    Otherwise the window runs as fast as possible: the global PsychoPy clock is shifted
+    forward to the next vsync on every flip and by every `WaitScheduler` sleep, so all
+    PsychoPy clocks see the time a real run would have taken.
+    """
+
+    def __init__(
+        self,
+        size=(1920, 1080),
+        color=(0, 0, 0),
+        units: str = "norm",
+        refresh_rate: float = 60.0,
+        realtime: bool = False,
+        **settings,
+    ) -> None:
+        self.size: np.ndarray = np.array(size)
+        self.useRetina: bool = False
+        self.color = color
+        self.units: str = units
+        self.mouseVisible: bool = False
+
+        self.refresh_rate: float = refresh_rate
+        self.monitorFramePeriod: float = 1.0 / refresh_rate
+        self.realtime: bool = realtime
+
+        self.frames: int = 0
+        """Number of flips since the window was created."""
+
+        self.draw_calls: int = 0
+        """Number of stimulus draws since the window was created."""
+
+        self._toDraw: list[VirtualStim] = []
+        self._skipped: float = 0.0
+        self._get_real_time = clock.getTime
+
+        if not self.realtime:
+            clock.getTime = self._get_time
+            WaitScheduler.set_sleep(self._skip)
+
+        self._last_flip: float = logging.defaultClock.getTime()
+
+    def _get_time(self) -> float:
+        return self._get_real_time() + self._skipped
+
+    def _skip(self, duration: float) -> None:
+        self._skipped += max(duration, 0.0)
+
+    def _next_flip(self, time: float) -> float:
+        next_flip = self._last_flip + self.monitorFramePeriod
+        if time > next_flip:
+            next_flip += (
+                math.ceil((time - next_flip) / self.monitorFramePeriod)
+                * self.monitorFramePeriod
+            )
+        return next_flip
+
+    def getFutureFlipTime(self, targetTime: float = 0, clock=None) -> float:
+        now = logging.defaultClock.getTime()
+        next_flip = self._next_flip(now + targetTime)
+
+        if clock == "now":
+            return next_flip - now
+        elif clock:
+            return (
+                next_flip
+                + logging.defaultClock.getLastResetTime()
+                - clock.getLastResetTime()
+            )
+        return next_flip
+
+    def getActualFrameRate(self, *args, **kwargs) -> float:
+        return self.refresh_rate
+
+    def flip(self, clearBuffer: bool = True) -> float:
+        for stimulus in self._toDraw:
+            stimulus.draw()
+
+        now = logging.defaultClock.getTime()
+        next_flip = self._next_flip(now)
+
+        if self.realtime:
+            WaitScheduler.wait_until(next_flip, timer=logging.defaultClock)
+        else:
+            self._skip(next_flip - now)
+
+        self._last_flip = next_flip
+        self.frames += 1
+
+        return next_flip
+
+    def close(self) -> None:
+        if not self.realtime:
+            clock.getTime = self._get_real_time
+            WaitScheduler.set_sleep()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import time
+
+from psychopy import clock
+
+DEFAULT_SPIN_MARGIN = 0.002
+MINIMUM_SPIN_MARGIN = 0.0005
+MAXIMUM_SPIN_MARGIN = 0.02
+
+
+class WaitScheduler:
+    """
+    Shared hybrid sleep/spin wait.
+
+    Sleeps for most of a wait and only spins for the last `spin_margin` seconds,
+    so waiting does not pin a core while still ending on time. The margin is
+    calibrated from the measured sleep overshoot with `WaitScheduler.calibrate()`.
+    """
+
+    spin_margin: float = DEFAULT_SPIN_MARGIN
+    calibrated: bool = False
+    _sleep = time.sleep
+
+    @classmethod
+    def set_sleep(cls, sleep=None) -> None:
+        """
+        Replaces the function used for the sleeping part of a wait. `None` restores `time.sleep`.
+        """
+
+        cls._sleep = sleep or time.sleep
+
+    @classmethod
+    def calibrate(cls, samples: int = 50, sleep_time: float = 0.001) -> float:
+        """
+        Measures how far `time.sleep` overshoots and sets `spin_margin` to cover the worst case.
+
+        Args:
+
+            `samples`       (int): Number of sleeps to measure.
+
+            `sleep_time`  (float): Length of each measured sleep.
+
+        Returns:
+
+            The new spin margin.
+        """
+
+        worst_overshoot = 0.0
+        for _ in range(samples):
+            start = clock.getTime()
+            time.sleep(sleep_time)
+            worst_overshoot = max(worst_overshoot, clock.getTime() - start - sleep_time)
+
+        cls.spin_margin = min(
+            max(worst_overshoot * 1.5, MINIMUM_SPIN_MARGIN), MAXIMUM_SPIN_MARGIN
+        )
+        cls.calibrated = True
+
+        return cls.spin_margin
+
+    @classmethod
+    def wait_until(cls, target: float, timer: clock.Clock = None) -> None:
+        """
+        Waits until `timer` reaches `target`.
+
+        Args:
+
+            `target`        (float): Time to wait for.
+
+            `timer`   (clock.Clock): Clock `target` is relative to. Defaults to the global clock.
+        """
+
+        get_time = timer.getTime if timer else clock.getTime
+
+        while (remaining := target - get_time()) > cls.spin_margin:
+            cls._sleep(remaining - cls.spin_margin)
+
+        while get_time() < target:
+            pass
+
+    @classmethod
+    def wait(cls, duration: float) -> None:
+        """
+        Waits for `duration` seconds.
+        """
+
+        if duration > 0.0:
+            cls.wait_until(clock.getTime() + duration)
@@ -1,6 +1,15 @@
 from __future__ import annotations
 
-from psychopy import clock, core, logging, visual
+from collections import deque
+from typing import Callable
+
+import numpy as np
+from psychopy import clock, core, event, logging, visual
+
+from conflict_task.constants import AFTER_FLIP_MARGIN, LAYER_CAPTURE_MARGIN
+
+from .EMG_connector import EMGConnector
+from .virtual_window import VirtualMouse, VirtualStim, VirtualWindow
 
 DEFAULT_WINDOW_SETTINGS = dict(
     # Color of background as [r, g, b] list or single value. Each gun can take values between -1.0 and 1.0
@@ -15,7 +24,7 @@ DEFAULT_WINDOW_SETTINGS = dict(
     monitor="BasicMonitor",
     # If False, window will have no mouse, toolbar, etc.
     allowGUI=False,
-    # Set the window type or back-end to use
+    # Set the window type or back-end to use. "virtual" needs no GPU or display, see VirtualWindow
     winType="pyglet",
     # Use framebuffer object
     useFBO=True,
@@ -39,6 +48,14 @@ class Window:
     _window: visual.Window = None
     _settings: dict = DEFAULT_WINDOW_SETTINGS
     started: bool = False
+    virtual: bool = False
+
+    # After-flip work queue
+    _after_flip: deque = deque()
+    deferred_tasks: int = 0
+    """Number of after-flip tasks run since the window started."""
+    deferred_time: float = 0.0
+    """Time spent running after-flip tasks since the window started."""
 
     @classmethod
     def settings(cls, window_settings={}):
@@ -50,7 +67,12 @@ class Window:
             if window_settings:
                 cls.settings(window_settings)
             
-            cls._window = visual.Window(**cls._settings)
+            cls.virtual = cls._settings["winType"] == "virtual"
+
+            if cls.virtual:
+                cls._window = VirtualWindow(**cls._settings)
+            else:
+                cls._window = visual.Window(**cls._settings)
 
             cls._window.mouseVisible = cls._settings["allowGUI"]
 
@@ -64,9 +86,84 @@ class Window:
     def turnoff(cls):
         cls._settings = DEFAULT_WINDOW_SETTINGS
         cls._window.flip()
+        cls.run_after_flip()
         cls._window.close()
         cls.started = False
 
+    @classmethod
+    def create_stimulus(cls, stimulus_type: str, spec: dict):
+        """
+        Creates a PsychoPy visual stimulus of `stimulus_type` on the window, or a `VirtualStim` on a virtual window.
+        """
+
+        if cls.virtual:
+            return VirtualStim(cls._window, stimulus_type=stimulus_type, **spec)
+        return getattr(visual, stimulus_type)(cls._window, **spec)
+
+    @classmethod
+    def get_capture_rect(cls, stimuli: list) -> tuple[float, float, float, float]:
+        """
+        Returns the `(left, top, right, bottom)` rect in norm units that covers `stimuli`, plus `LAYER_CAPTURE_MARGIN` pixels.
+
+        Falls back to the whole window if a stimulus does not report its `verticesPix`.
+        """
+
+        try:
+            vertices = np.concatenate(
+                [np.reshape(stimulus.verticesPix, (-1, 2)) for stimulus in stimuli]
+            ).astype(float)
+        except (AttributeError, TypeError, ValueError):
+            return (-1.0, 1.0, 1.0, -1.0)
+
+        half_size = np.asarray(cls._window.size, dtype=float) / 2
+        left, bottom = np.clip(
+            (vertices.min(axis=0) - LAYER_CAPTURE_MARGIN) / half_size, -1.0, 1.0
+        )
+        right, top = np.clip(
+            (vertices.max(axis=0) + LAYER_CAPTURE_MARGIN) / half_size, -1.0, 1.0
+        )
+        return (float(left), float(top), float(right), float(bottom))
+
+    @classmethod
+    def create_layer(cls, stimuli: list):
+        """
+        Renders `stimuli` once into a `BufferImageStim` that only covers their bounds.
+
+        This clears the back buffer, so call it between frames, not while one is being drawn.
+        """
+
+        left, top, right, bottom = rect = cls.get_capture_rect(stimuli)
+        # The capture is drawn centered on `pos`, which is in norm units on a norm window and in pixels otherwise
+        pos = np.array(((left + right) / 2, (top + bottom) / 2))
+        if cls._window.units != "norm":
+            pos *= np.asarray(cls._window.size, dtype=float) / 2
+
+        return cls.create_stimulus(
+            "BufferImageStim", {"stim": stimuli, "rect": rect, "pos": pos}
+        )
+
+    @classmethod
+    def create_mouse(cls, visible: bool = True):
+        """
+        Creates a PsychoPy mouse on the window, or a `VirtualMouse` on a virtual window.
+
+        Args:
+
+            `visible`   (bool): Show the mouse cursor. Defaults to True.
+        """
+
+        if cls.virtual:
+            return VirtualMouse(cls._window, visible=visible)
+        return event.Mouse(visible=visible, win=cls._window)
+
+    @classmethod
+    def get_mouse_visible(cls) -> bool:
+        """
+        Returns whether the mouse cursor is shown on the window.
+        """
+
+        return bool(cls._window.mouseVisible)
+
     @classmethod
     def _error_if_window_not_started(cls):
         if not cls.started:
@@ -114,19 +211,82 @@ class Window:
             threshold=threshold,
         )
 
+    @classmethod
+    def get_frame_period(cls) -> float:
+        cls._error_if_window_not_started()
+        return cls._window.monitorFramePeriod
+
     @classmethod
     def get_future_flip_time(cls, target_time: float = 0, clock: clock = None) -> float:
         cls._error_if_window_not_started()
         return cls._window.getFutureFlipTime(targetTime=target_time, clock=clock)
 
     @classmethod
-    def flip(cls, clear_buffer: bool = True):
+    def flip(cls, clear_buffer: bool = True) -> float:
         cls._error_if_window_not_started()
-        cls._window.flip(clearBuffer=clear_buffer)
+        flip_timestamp = cls._window.flip(clearBuffer=clear_buffer)
+        if cls._after_flip:
+            cls.run_after_flip(flip_timestamp)
+        return flip_timestamp
+
+    @classmethod
+    def after_flip(cls, task: Callable, *args) -> None:
+        """
+        Defers `task(*args)` until right after the next flip.
+
+        Use it for work that does not change what is drawn, like marker sends and bookkeeping,
+        so it stays out of the time between starting a frame and flipping it.
+        """
+
+        cls._after_flip.append((task, args))
+
+    @classmethod
+    def run_after_flip(cls, flip_timestamp: float = None) -> int:
+        """
+        Runs deferred tasks in the order they were added.
+
+        With a `flip_timestamp`, tasks only run until `AFTER_FLIP_MARGIN` before the next flip
+        is due. At least one task runs each time, the rest stay queued for the next flip.
+        Without one, the whole queue is run.
+
+        Args:
+
+            `flip_timestamp`    (float): Time of the flip that was just made, as returned by `flip`.
+
+        Returns:
+
+            Number of tasks run (int).
+        """
+
+        queue = cls._after_flip
+        get_time = logging.defaultClock.getTime
+        start = get_time()
+
+        if flip_timestamp is None:
+            deadline = None
+        else:
+            deadline = flip_timestamp + cls._window.monitorFramePeriod - AFTER_FLIP_MARGIN
+
+        ran = 0
+        while queue and (deadline is None or ran == 0 or get_time() < deadline):
+            task, args = queue.popleft()
+            task(*args)
+            ran += 1
+
+        cls.deferred_tasks += ran
+        cls.deferred_time += get_time() - start
+        return ran
 
     @classmethod
     def quit(cls):
         if cls.started:
             cls._window.flip()
+
+        # Deferred tasks and markers still being sent must finish before the process exits
+        cls.run_after_flip()
+        EMGConnector.flush()
+        EMGConnector.stop()
+
+        if cls.started:
             cls._window.close()
         core.quit()
@@ -1,4 +1,4 @@
-from conflict_task.devices import DataHandler, Window
+from conflict_task.devices import AssetLoader, DataHandler, Window
 from conflict_task.devices.window import Window
 from conflict_task.sequence import Screen
 from conflict_task.util.dictionary import get_or_fatal_exit, get_type, get_type_or_fatal_exit
@@ -66,6 +66,9 @@ class Instructions:
 
             self.run_sequence(page)
 
+            # Stimuli decoded in the background are uploaded between pages
+            AssetLoader.upload()
+
             if page.response.made:
                 if page.response.key == self.key_forward:
                     self.go_forward()
@@ -7,7 +7,9 @@ from psychopy import clock
 from conflict_task.component import (
     AudioComponent,
     BaseComponent,
+    CorrectMouseResponseComponent,
     CorrectResponseComponent,
+    MouseResponseComponent,
     ResponseComponent,
     VisualComponent,
     WaitComponent,
@@ -16,10 +18,11 @@ from conflict_task.constants import (
     FRAMETOLERANCE,
     INFINITY,
     KEEP_RUNNING,
+    NOMINAL_FRAME_PERIOD,
     QUIT_EXPERIMENT,
     STOP_RUNNING,
 )
-from conflict_task.devices import EMGConnector, InputDevice, Window
+from conflict_task.devices import EMGConnector, InputDevice, WaitScheduler, Window
 from conflict_task.util import (
     fatal_exit,
     get_type,
@@ -27,6 +30,9 @@ from conflict_task.util import (
     true_or_fatal_exit,
 )
 
+from .frame_recorder import FrameRecorder
+from .timeline import Timeline
+
 
 class BaseSequence:
     name: str = "UNKNOWN_SEQUENCE"
@@ -40,6 +46,20 @@ class BaseSequence:
         self.persistent: list[VisualComponent] = None
         self.audio: list[AudioComponent] = []
         self.wait: list[WaitComponent] = []
+        self.timeline: Timeline = None
+
+        # Drawing
+        self.background: list[VisualComponent] = []
+        self.draw_list: list[VisualComponent] = []
+        self.cache_persistent: bool = False
+        self.layer_builds: int = 0
+        self._layer = None
+        self._layer_key: tuple = None
+        self._layer_components: list[VisualComponent] = []
+        self._front: list[VisualComponent] = []
+
+        # Frozen state
+        self.frozen: bool = False
 
         # Clock
         self.clock: clock.Clock = clock.Clock()
@@ -64,12 +84,54 @@ class BaseSequence:
         # Trial
         self.takes_trial_values: bool = False
         self.feedback: bool = False
+        self.response_data: dict = None
+
+        # Pipelined preparation
+        self._prepared_values: dict = None
+        self._data_snapshot: dict = None
+
+        # Frame timing
+        self.frame_timing: bool = False
+        self._frame: int = 0
+        self.dropped_frames: int = 0
+        self.deferred_tasks: int = 0
+        self.deferred_time: float = 0.0
+        self._frame_period: float = None
+        self._last_flip: float = None
+        self._stimulus_on_screen: bool = False
+        self._static_components: list[VisualComponent] = []
+        self.record_frames: bool = False
+        self.frame_budget: float = None
+        self.frame_recorder: FrameRecorder = None
 
         self._parse_sequence_settings(sequence_settings)
         self._parse_component_settings(sequence_settings)
 
+        self.freeze()
+
+    def _base_sequence_should_not_be_run(self) -> None:
+        if self.__class__.__name__ == "BaseSequence":
+            fatal_exit("An instance of BaseSequence should not be created nor run")
+
+    def freeze(self) -> None:
+        """
+        Validates the sequence and its components once and marks them as frozen.
+
+        Frozen sequences and components skip their guards in the methods that are run every trial
+        or every frame. Called at the end of construction; call again after changing components.
+        """
+
+        self.frozen = False
+        self._base_sequence_should_not_be_run()
+
+        components = self._get_all_components()
+
+        true_or_fatal_exit(components != [], f"{self.name}: Sequence has no components")
+
         true_or_fatal_exit(
-            self._get_all_components() != [], f"{self.name}: Sequence has no components"
+            self.frame_timing
+            or not any(component.uses_frames() for component in components),
+            f"{self.name}: Component timing in frames requires the 'frame_timing' sequence setting",
         )
 
         true_or_fatal_exit(
@@ -82,9 +144,92 @@ class BaseSequence:
             f"{self.name}: Sequence has no way to finish",
         )
 
-    def _base_sequence_should_not_be_run(self) -> None:
-        if self.__class__.__name__ == "BaseSequence":
-            fatal_exit("An instance of BaseSequence should not be created nor run")
+        for component in [*components, *(self.persistent or [])]:
+            component.freeze()
+
+        self.timeline = Timeline(components, visible=self.visual)
+        self._build_draw_list()
+        self.frozen = True
+
+    def _build_draw_list(self) -> None:
+        # Back to front by depth. Ties keep background, persistent and visual order
+        self._static_components = [*self.background, *(self.persistent or [])]
+        visual_components = [*self._static_components, *self.visual]
+
+        for component in visual_components:
+            component.auto_draw = False
+
+        self.draw_list = sorted(
+            visual_components, key=lambda component: -component.depth
+        )
+
+        # Static components drawn behind everything else can be cached in a single layer
+        self._layer_components = []
+        if self.cache_persistent:
+            static = {id(component) for component in self._static_components}
+            for component in self.draw_list:
+                if id(component) not in static:
+                    break
+                self._layer_components.append(component)
+
+        self._front = self.draw_list[len(self._layer_components) :]
+        self.invalidate_layer()
+
+    def set_background(self, components: list[VisualComponent]) -> None:
+        """
+        Draws `components` of another sequence behind this one's, while they are visible.
+
+        Used to keep a trial's persistent components on screen during its feedback.
+        """
+
+        self.background = components
+        self._build_draw_list()
+
+    def invalidate_layer(self) -> None:
+        """
+        Makes the next run's preparation render the cached persistent layer again.
+
+        Swapping the stimulus of a persistent component does this by itself. Call it after
+        changing a persistent stimulus in place. Until the layer is rendered again, the
+        persistent components are drawn one by one.
+        """
+
+        self._layer_key = None
+
+    def _get_layer_key(self) -> tuple:
+        return tuple(id(component.component) for component in self._layer_components)
+
+    def _build_layer(self) -> None:
+        # Rendering the layer clears the back buffer, so it is done while preparing a run
+        key = self._get_layer_key()
+        if key != self._layer_key:
+            self._layer = Window.create_layer(
+                [component.component for component in self._layer_components]
+            )
+            self._layer_key = key
+            self.layer_builds += 1
+
+    def _draw_layer(self) -> None:
+        visible = [component.visible for component in self._layer_components]
+        if not any(visible):
+            return
+
+        # The layer holds every component with the stimuli it was prepared with
+        if all(visible) and self._get_layer_key() == self._layer_key:
+            self._layer.draw()
+            return
+
+        for component in self._layer_components:
+            if component.visible:
+                component.draw()
+
+    def _draw(self) -> None:
+        if self._layer_components:
+            self._draw_layer()
+
+        for component in self._front:
+            if component.visible:
+                component.draw()
 
     # ===============================================
     # Dictionary parsing
@@ -141,6 +286,9 @@ class BaseSequence:
             self.variable_factor["marker_start"] = "marker_start"
             self.variable_factor["marker_end"] = "marker_end"
 
+        if self.record_frames:
+            self.frame_recorder = FrameRecorder()
+
     def _parse_component_settings(self, sequence_settings: dict) -> None:
         self._base_sequence_should_not_be_run()
 
@@ -157,8 +305,14 @@ class BaseSequence:
             self.wait = self._create_components(wait_components, WaitComponent)
 
         if (response := get_type(sequence_settings, "response", dict)) is not None:
+            mouse = response.get("type") == "mouse"
             if response.get("correct", False):
-                self.response = CorrectResponseComponent(response)
+                if mouse:
+                    self.response = CorrectMouseResponseComponent(response)
+                else:
+                    self.response = CorrectResponseComponent(response)
+            elif mouse:
+                self.response = MouseResponseComponent(response)
             else:
                 self.response = ResponseComponent(response)
 
@@ -183,7 +337,8 @@ class BaseSequence:
         return components
 
     def _get_all_components(self) -> list[BaseComponent]:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
         return [
             component
@@ -199,17 +354,22 @@ class BaseSequence:
     def _stop_all_components(
         self, time: float, time_flip: float, global_flip: float
     ) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
-        for component in self._get_all_components():
-            if component.started():
-                component.stop(time, time_flip, global_flip)
+        self.timeline.stop_all(time, time_flip, global_flip)
 
     def _get_duration(self) -> float:
         self._base_sequence_should_not_be_run()
 
+        frame_period = (
+            Window.get_frame_period() if Window.started else NOMINAL_FRAME_PERIOD
+        )
         duration = max(
-            [component.stop_time for component in self._get_all_components()]
+            [
+                component.get_stop_time(frame_period)
+                for component in self._get_all_components()
+            ]
         )
 
         if self.timed and self.timed < duration:
@@ -225,7 +385,7 @@ class BaseSequence:
             0 < marker < 256,
             f"{self.name}: Marker value must be in the range of 1-255. Value is {marker}",
         )
-        EMGConnector.send_marker(marker)
+        Window.after_flip(EMGConnector.send_marker_async, marker)
 
     # ===============================================
     # Sequence execution functions
@@ -238,21 +398,36 @@ class BaseSequence:
                     requested_trial_values.append(*component.variable_factor.values())
         return requested_trial_values
 
+    def build_pools(self, trial_values_list: list[dict]) -> None:
+        """
+        Pre-builds the stimuli of the visual components for every trial in `trial_values_list`.
+        """
+
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
+
+        if self.takes_trial_values:
+            for component in self.visual:
+                component.build_pool(trial_values_list)
+
     def _refresh_components(self) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
         for component in self._get_all_components():
             component.refresh()
 
     def _prepare_components(self, trial_values: dict) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
         if self.takes_trial_values:
             for component in self._get_all_components():
                 component.prepare(trial_values)
 
     def prepare(self, trial_values: dict) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
         if self.variable_factor:
             for factor_name, factor_id in self.variable_factor.items():
@@ -263,17 +438,26 @@ class BaseSequence:
                 setattr(self, factor_name, trial_values[factor_id])
 
     def refresh(self, new_t: float = 0.0) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
 
         self.reset_clock(new_t=new_t)
         InputDevice.reset_clock(new_t=new_t)
         InputDevice.reset_events()
 
     def _run_frame(self, early_quit=[]) -> None:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
+
+        if self.frame_recorder:
+            frame_start = clock.getTime()
+
+        # Drain the input device once for the quit check and the response component
+        if len(early_quit) or (self.response and self.response.started()):
+            InputDevice.poll()
 
         # Check if user wants to quit experiment
-        if len(early_quit) and InputDevice.was_key_pressed(early_quit):
+        if len(early_quit) and InputDevice.was_key_pressed(early_quit, poll=False):
             return QUIT_EXPERIMENT
 
         # Get current timers
@@ -281,28 +465,11 @@ class BaseSequence:
         time_flip = Window.get_future_flip_time(clock=self.clock)
         time_global_flip = Window.get_future_flip_time()
 
-        # Return variable is whether or not to continue the sequence
-        keep_running = STOP_RUNNING
-
-        # Iterate through components
-        for component in self._get_all_components():
+        # Start and stop the components that are due this frame
+        self.timeline.advance(time, time_flip, time_global_flip, self._frame)
 
-            # Either start them...
-            if (
-                component.not_started()
-                and time_flip >= component.start_time - FRAMETOLERANCE
-            ):
-                component.start(time, time_flip, time_global_flip)
-            # ...or stop them
-            elif (
-                component.started()
-                and time_flip >= component.stop_time - FRAMETOLERANCE
-            ):
-                component.stop(time, time_flip, time_global_flip)
-
-            # If not all components have finished, continue the sequence
-            if not component.finished():
-                keep_running = KEEP_RUNNING
+        # If not all components have finished, continue the sequence
+        keep_running = KEEP_RUNNING if self.timeline.unfinished else STOP_RUNNING
 
         # If sequence has a response component check for it
         if self.response:
@@ -323,28 +490,115 @@ class BaseSequence:
 
         if keep_running == STOP_RUNNING:
             self._stop_all_components(time, time_flip, time_global_flip)
-        
+
+        self._draw()
+
         # Flip window
-        Window.flip()
+        if self.frame_recorder:
+            flip_start = clock.getTime()
+            deferred_time = Window.deferred_time
+        flip_timestamp = Window.flip()
+        if self.frame_recorder:
+            # Time spent on after-flip tasks is not part of the flip itself
+            self.frame_recorder.record(
+                frame_start,
+                flip_start - frame_start,
+                clock.getTime() - flip_start - (Window.deferred_time - deferred_time),
+                flip_timestamp,
+            )
+
+        if self.response:
+            self.response.record_flip(flip_timestamp)
+
+        self._count_dropped_frames(flip_timestamp)
+        self._frame += 1
 
         # Continue sequence or not
         return keep_running
 
+    def _count_dropped_frames(self, flip_timestamp: float) -> None:
+        # Frames dropped between the previous flip and this one, counted only if a
+        # stimulus was on screen in between. Persistent and background stimuli are
+        # started outside the timeline, so they are checked here
+        if flip_timestamp is None:
+            return
+
+        if self._stimulus_on_screen and self._last_flip is not None:
+            missed = round((flip_timestamp - self._last_flip) / self._frame_period) - 1
+            if missed > 0:
+                self.dropped_frames += missed
+
+        self._last_flip = flip_timestamp
+        self._stimulus_on_screen = self.timeline.on_screen > 0 or any(
+            component.started() for component in self._static_components
+        )
+
     # ===============================================
     # Public member functions
     # ===============================================
-    def run(self, trial_values: dict = {}, allow_escape=False) -> None:
-        self._base_sequence_should_not_be_run()
+    def _prepare_run(self, trial_values: dict) -> None:
+        """
+        Prepares the sequence and its components for a run with `trial_values`.
 
-        early_quit = self.early_quit_keys.copy()
-        if allow_escape:
-            early_quit.append("escape")
+        `run` calls this itself, unless the previous run already prepared for the same `trial_values`.
+        """
 
         self.prepare(trial_values)
         self._refresh_components()
         self._prepare_components(trial_values)
+        self.timeline.compile(Window.get_frame_period() if self.frame_timing else None)
+        if self._layer_components:
+            self._build_layer()
+        self._prepared_values = trial_values
+
+    def _snapshot_data(self) -> None:
+        # Keeps the data of the run that just finished, since preparing the next
+        # run refreshes the components
+        self._data_snapshot = {
+            prepend_key: self._get_data(prepend_key) for prepend_key in (True, False)
+        }
+        if self.response:
+            self.response_data = self.response.get_response_data()
+
+    def run(
+        self,
+        trial_values: dict = {},
+        allow_escape=False,
+        next_trial_values: dict = None,
+    ) -> None:
+        """
+        Runs the sequence once with `trial_values`.
+
+        If `next_trial_values` is given, the next run is prepared during this run's post-trial
+        interval, so it can start flipping right away. `get_data` and `response_data` still
+        return this run's data until the next run starts.
+        """
+
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
+
+        early_quit = self.early_quit_keys.copy()
+        if allow_escape:
+            early_quit.append("escape")
+
+        if self._prepared_values is not trial_values:
+            self._prepare_run(trial_values)
+        self._prepared_values = None
+        self._data_snapshot = None
+        self.response_data = None
+
+        InputDevice.prepare(trial_values)
+        self._frame_period = Window.get_frame_period()
+        self.dropped_frames = 0
+        self._frame = 0
+        self._last_flip = None
+        self._stimulus_on_screen = False
+        if self.frame_recorder:
+            self.frame_recorder.reset(self.frame_budget or self._frame_period)
         self.refresh(new_t=Window.get_future_flip_time(clock="now"))
 
+        deferred_tasks = Window.deferred_tasks
+        deferred_time = Window.deferred_time
         running = KEEP_RUNNING
 
         if self.marker:
@@ -354,18 +608,33 @@ class BaseSequence:
             running = self._run_frame(early_quit=early_quit)
 
             if running == QUIT_EXPERIMENT:
+                Window.run_after_flip()
                 return False
 
+        for component in self.timeline.components:
+            component.record_timing_errors(
+                self._frame_period, self.timeline.frame_timing
+            )
+
         if self.marker:
             self.send_marker_value(self.marker_end + self.marker_addition)
-        
+
+        # Nothing is drawn anymore, so what is left of the queue can run now
+        Window.run_after_flip()
+        self.deferred_tasks = Window.deferred_tasks - deferred_tasks
+        self.deferred_time = Window.deferred_time - deferred_time
+
+        t = self.clock.getTime() + self.post_trial_interval
+
+        if next_trial_values is not None:
+            self._snapshot_data()
+            self._prepare_run(next_trial_values)
+
         if self.post_trial_interval != 0.0:
-            t = self.clock.getTime() + self.post_trial_interval
-            while self.clock.getTime() <= t - FRAMETOLERANCE:
-                pass
+            WaitScheduler.wait_until(t - FRAMETOLERANCE, timer=self.clock)
 
         return True
-    
+
     def start_persistent(self):
         if self.persistent:
             time = self.clock.getTime()
@@ -373,7 +642,7 @@ class BaseSequence:
             time_global_flip = Window.get_future_flip_time()
             for persistent in self.persistent:
                 persistent.start(time, time_flip, time_global_flip)
-    
+
     def stop_persistent(self):
         if self.persistent:
             time = self.clock.getTime()
@@ -383,8 +652,15 @@ class BaseSequence:
                 persistent.stop(time, time_flip, time_global_flip)
 
     def get_data(self, prepend_key=True) -> dict:
-        self._base_sequence_should_not_be_run()
+        if not self.frozen:
+            self._base_sequence_should_not_be_run()
+
+        if self._data_snapshot is not None:
+            return self._data_snapshot[prepend_key]
+
+        return self._get_data(prepend_key)
 
+    def _get_data(self, prepend_key: bool) -> dict:
         def merge_data(data: dict, component: BaseComponent):
             data.update(component.get_data(prepend_key=prepend_key))
             return data
@@ -395,6 +671,13 @@ class BaseSequence:
             {},
         )
 
+        data["dropped_frames"] = self.dropped_frames
+        data["deferred_tasks"] = self.deferred_tasks
+        data["deferred_time"] = self.deferred_time
+
+        if self.frame_recorder:
+            data.update(self.frame_recorder.get_data(prepend_key=prepend_key))
+
         if prepend_key:
             data = {f"{self.name}.{key}": value for key, value in data.items()}
 
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import numpy as np
+
+from conflict_task.constants import FRAME_RECORDER_CAPACITY
+
+FRAME_START = 0
+LOOP_TIME = 1
+FLIP_TIME = 2
+FLIP_TIMESTAMP = 3
+
+
+class FrameRecorder:
+    """
+    Opt-in recorder of per-frame timing for a sequence.
+
+    Each frame stores the time the frame's work started, the time spent before the flip,
+    the time spent in `Window.flip()` and the flip timestamp. Samples go into a preallocated
+    ring buffer which keeps the latest `capacity` frames; the summary covers every frame.
+    """
+
+    name = "frames"
+
+    def __init__(self, capacity: int = FRAME_RECORDER_CAPACITY) -> None:
+        self.samples: np.ndarray = np.zeros((capacity, 4))
+        """Ring buffer of frame start, loop time, flip time and flip timestamp per frame."""
+
+        self.capacity: int = capacity
+        """Number of frames the ring buffer holds."""
+
+        self.budget: float = None
+        """Loop time a frame may take before it counts as over budget."""
+
+        self.count: int = 0
+        """Number of frames recorded since the last reset."""
+
+        self.loop_time_total: float = 0.0
+        self.loop_time_max: float = 0.0
+        self.over_budget: int = 0
+
+    def reset(self, budget: float) -> None:
+        """
+        Clears the recorder before a sequence run. The buffer itself is reused.
+        """
+
+        self.budget = budget
+        self.count = 0
+        self.loop_time_total = 0.0
+        self.loop_time_max = 0.0
+        self.over_budget = 0
+
+    def record(
+        self,
+        frame_start: float,
+        loop_time: float,
+        flip_time: float,
+        flip_timestamp: float,
+    ) -> None:
+        """
+        Records one frame's timing.
+
+        Args:
+
+            `frame_start`       (float): Time the frame's work started.
+
+            `loop_time`         (float): Time spent on the frame before the flip.
+
+            `flip_time`         (float): Time spent in `Window.flip()`.
+
+            `flip_timestamp`    (float): Time of the flip as returned by `Window.flip()`. Stored as NaN if None.
+        """
+
+        sample = self.samples[self.count % self.capacity]
+        sample[FRAME_START] = frame_start
+        sample[LOOP_TIME] = loop_time
+        sample[FLIP_TIME] = flip_time
+        # The loop time still counts if the window gave no flip timestamp
+        sample[FLIP_TIMESTAMP] = np.nan if flip_timestamp is None else flip_timestamp
+
+        self.count += 1
+        self.loop_time_total += loop_time
+        if loop_time > self.loop_time_max:
+            self.loop_time_max = loop_time
+        if loop_time > self.budget:
+            self.over_budget += 1
+
+    def get_samples(self) -> np.ndarray:
+        """
+        Returns the frames still held in the ring buffer, oldest first.
+        """
+
+        if self.count <= self.capacity:
+            return self.samples[: self.count].copy()
+
+        start = self.count % self.capacity
+        return np.concatenate((self.samples[start:], self.samples[:start]))
+
+    def get_data(self, prepend_key: bool = True) -> dict:
+        """
+        Returns the summary of the recorded frames.
+        """
+
+        data = {
+            "count": self.count,
+            "loop_time_mean": self.loop_time_total / self.count if self.count else None,
+            "loop_time_max": self.loop_time_max if self.count else None,
+            "over_budget": self.over_budget,
+            "budget": self.budget,
+        }
+
+        if prepend_key:
+            data = {f"{self.name}.{key}": value for key, value in data.items()}
+
+        return data
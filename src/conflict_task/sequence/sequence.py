@@ -7,6 +7,10 @@ DEFAULT_SEQUENCE_SETTINGS = {
     "cut_on_response": False,
     "timed": False,
     "marker": False,
+    "record_frames": False,
+    "frame_budget": 0.0,
+    "cache_persistent": False,
+    "frame_timing": False,
 }
 
 
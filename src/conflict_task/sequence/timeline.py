@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from conflict_task.component import BaseComponent
+from conflict_task.constants import FRAMETOLERANCE, INFINITY
+
+START_EVENT = 0
+STOP_EVENT = 1
+
+
+class Timeline:
+    """
+    Sorted start/stop event timeline of a sequence's components.
+
+    Compiled once per run, after the components have been prepared. During the frame loop
+    a cursor moves through the events that are due, so the cost of a frame depends on
+    the events due that frame and not on the number of components.
+
+    Compiled with a frame period, events are scheduled on flip counts instead of flip times.
+    Times in seconds are then rounded to frames once, at compile time.
+    """
+
+    def __init__(
+        self, components: list[BaseComponent], visible: list[BaseComponent] = []
+    ) -> None:
+        self.components: list[BaseComponent] = components
+        """Components in sequence order. Ties in event time keep this order."""
+
+        self._visible: set[int] = {id(component) for component in visible}
+        """Ids of the components that put a stimulus on screen while started."""
+
+        self._times: list[float] = []
+        """Event times, with the frame tolerance already subtracted. Flip counts with frame timing."""
+
+        self.frame_timing: bool = False
+        """True if events are scheduled on flip counts."""
+
+        self._events: list[tuple[int, BaseComponent, bool]] = []
+        """Event kind (`START_EVENT` or `STOP_EVENT`), its component and whether it is visible."""
+
+        self._cursor: int = 0
+        """Index of the next event that has not been run."""
+
+        self._carried: list[tuple[BaseComponent, bool]] = []
+        """Components that became due to stop on the frame they started."""
+
+        self.unfinished: int = 0
+        """Number of components that have not finished yet."""
+
+        self.on_screen: int = 0
+        """Number of visible components that are currently started."""
+
+        self.compile()
+
+    def compile(self, frame_period: float = None) -> None:
+        """
+        Builds the sorted event list from each component's `start_time` and `stop_time`.
+
+        Components with an infinite stop time only get a start event. They keep the
+        sequence running until it is stopped by a response, a timer or `stop_all`.
+
+        Args:
+
+            `frame_period`  (float): Schedule on flip counts, converting seconds with this frame period.
+            Defaults to `None`, which schedules on flip times.
+        """
+
+        self.frame_timing = frame_period is not None
+
+        events = []
+        for order, component in enumerate(self.components):
+            visible = id(component) in self._visible
+            if self.frame_timing:
+                start, stop = component.get_frames(frame_period)
+            else:
+                start, stop = component.start_time, component.stop_time
+            events.append((start, START_EVENT, order, component, visible))
+            if stop != INFINITY:
+                events.append((stop, STOP_EVENT, order, component, visible))
+
+        events.sort(key=lambda event: event[:3])
+
+        if self.frame_timing:
+            self._times = [frame for frame, *_ in events]
+        else:
+            self._times = [time - FRAMETOLERANCE for time, *_ in events]
+        self._events = [
+            (kind, component, visible) for _, kind, _, component, visible in events
+        ]
+        self._cursor = 0
+        self._carried = []
+        self.unfinished = len(self.components)
+        self.on_screen = 0
+
+    def advance(
+        self, time: float, time_flip: float, global_flip: float, frame: int = None
+    ) -> None:
+        """
+        Starts and stops every component whose event is due at `time_flip`, or at flip `frame` with frame timing.
+
+        A component is never started and stopped on the same frame. If its stop event
+        is due on the frame it started, the stop is carried over to the next frame.
+
+        Args:
+
+            `time`          (float): Time relative to sequence start.
+
+            `time_flip`     (float): Screen flip time relative to sequence start.
+
+            `global_flip`   (float): Screen flip time relative to experiment start.
+
+            `frame`           (int): Number of flips since the sequence started. Only used with frame timing.
+        """
+
+        if self._carried:
+            for component, visible in self._carried:
+                component.stop(time, time_flip, global_flip)
+                self.on_screen -= visible
+            self.unfinished -= len(self._carried)
+            self._carried = []
+
+        times = self._times
+        end = len(times)
+        cursor = self._cursor
+        now = frame if self.frame_timing else time_flip
+
+        while cursor < end and now >= times[cursor]:
+            kind, component, visible = self._events[cursor]
+            cursor += 1
+
+            if kind == START_EVENT:
+                component.start(time, time_flip, global_flip)
+                self.on_screen += visible
+            elif component.time_started_flip == time_flip:
+                self._carried.append((component, visible))
+            else:
+                component.stop(time, time_flip, global_flip)
+                self.unfinished -= 1
+                self.on_screen -= visible
+
+        self._cursor = cursor
+
+    def stop_all(self, time: float, time_flip: float, global_flip: float) -> None:
+        """
+        Stops every component that is still running and skips the rest of the events.
+        """
+
+        for component in self.components:
+            if component.started():
+                component.stop(time, time_flip, global_flip)
+
+        self._cursor = len(self._times)
+        self._carried = []
+        self.unfinished = 0
+        self.on_screen = 0
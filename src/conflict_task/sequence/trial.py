@@ -39,20 +39,26 @@ class Trial(Sequence):
                 self.name != self.feedback_sequence.name,
                 f"{self.name} - Trial and its feedback cannot have the same name",
             )
+            if self.persistent:
+                self.feedback_sequence.set_background(self.persistent)
 
         elif self.feedback:
             fatal_exit(f"No settings found for feedback in trial: {self.name}")
 
-    def run(self, trial_values: dict = {}, allow_escape=False):
+    def run(self, trial_values: dict = {}, allow_escape=False, next_trial_values=None):
         trial_success = super().run(
-            trial_values=trial_values, allow_escape=allow_escape
+            trial_values=trial_values,
+            allow_escape=allow_escape,
+            next_trial_values=next_trial_values,
         )
 
         if not trial_success:
             return trial_success
 
         if self.feedback:
-            feedback_values = {**trial_values, **self.response.get_response_data()}
+            # The response may already be refreshed for the next trial
+            response_data = self.response_data or self.response.get_response_data()
+            feedback_values = {**trial_values, **response_data}
 
             feedback_success = self.feedback_sequence.run(
                 trial_values=feedback_values, allow_escape=allow_escape
@@ -0,0 +1,240 @@
+"""
+Benchmark suite for the framework's own overhead.
+
+Runs on a virtual window, so it needs no display. Covers `Trial` construction,
+`prepare`/`refresh`, `_run_frame` with the trial frozen and unfrozen, `get_data`,
+`DataHandler.add_data_dict_and_next_entry` and `sequencing_helpers.counterbalance`,
+for every requested component count. Results are written as JSON so runs can be compared.
+
+    python tests/benchmarks/run_benchmarks.py --components 1 20 100 --trials 96 \\
+        --factor-levels 2 2 --output benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from time import perf_counter
+
+from psychopy import __version__ as psychopy_version
+
+from conflict_task.devices import DataHandler, Window
+from conflict_task.sequence import Trial
+from sequencing_helpers import counterbalance
+
+FRAMES_PER_RUN = 100
+
+
+def create_trial_settings(nr_components: int) -> dict:
+    return {
+        "name": "BenchmarkTrial",
+        "visual": [
+            {
+                "name": f"stimulus_{i}",
+                "type": "text",
+                "stop": 1000.0,
+                "spec": {"text": "+", "size": 32},
+                "variable": {"text": "stimulus_text"},
+            }
+            for i in range(nr_components)
+        ],
+        "response": {
+            "correct": True,
+            "keys": ["f", "j"],
+            "stop": 1000.0,
+        },
+    }
+
+
+def create_trial_values(nr_trials: int, factor_levels: list[int]) -> list[dict]:
+    conditions = list(itertools.product(*(range(levels) for levels in factor_levels)))
+    return [
+        {
+            "stimulus_text": "-".join(str(level) for level in condition),
+            "correct_key": "f" if condition[0] == 0 else "j",
+        }
+        for condition in itertools.islice(itertools.cycle(conditions), nr_trials)
+    ]
+
+
+def summarize(name: str, params: dict, samples: list[float]) -> dict:
+    return {
+        "name": name,
+        "params": params,
+        "n": len(samples),
+        "mean": statistics.fmean(samples),
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def time_calls(function, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        tic = perf_counter()
+        function()
+        samples.append(perf_counter() - tic)
+    return samples
+
+
+def set_frozen(trial: Trial, frozen: bool) -> None:
+    # Unfrozen sequences and components run their guards on every call, like before freezing
+    trial.frozen = frozen
+    for component in trial._get_all_components():
+        component.frozen = frozen
+
+
+def start_run(trial: Trial, trial_values: dict) -> None:
+    trial._prepare_run(trial_values)
+    trial._frame_period = Window.get_frame_period()
+    trial.refresh(new_t=Window.get_future_flip_time(clock="now"))
+
+
+def benchmark_trial(nr_components: int, trial_values_list: list[dict], repeat: int):
+    params = {"components": nr_components, "trials": len(trial_values_list)}
+    settings = create_trial_settings(nr_components)
+    results = []
+
+    results.append(
+        summarize(
+            "trial_construction",
+            params,
+            time_calls(lambda: Trial(create_trial_settings(nr_components)), repeat),
+        )
+    )
+
+    trial = Trial(settings)
+    values = iter(itertools.cycle(trial_values_list))
+
+    def prepare_refresh():
+        trial_values = next(values)
+        trial.prepare(trial_values)
+        trial._refresh_components()
+        trial._prepare_components(trial_values)
+
+    results.append(
+        summarize(
+            "prepare_refresh",
+            params,
+            time_calls(prepare_refresh, len(trial_values_list)),
+        )
+    )
+
+    for name, frozen in [("run_frame", True), ("run_frame_unfrozen", False)]:
+        frame_samples = []
+        for _ in range(repeat):
+            start_run(trial, next(values))
+            set_frozen(trial, frozen)
+            frame_samples.extend(time_calls(trial._run_frame, FRAMES_PER_RUN))
+            set_frozen(trial, True)
+        results.append(summarize(name, params, frame_samples))
+
+    trial.timeline.stop_all(0.0, 0.0, 0.0)
+    results.append(
+        summarize(
+            "get_data", params, time_calls(trial.get_data, len(trial_values_list))
+        )
+    )
+
+    data = trial.get_data()
+    results.append(
+        summarize(
+            "add_data_dict_and_next_entry",
+            params,
+            time_calls(
+                lambda: DataHandler.add_data_dict_and_next_entry(data),
+                len(trial_values_list),
+            ),
+        )
+    )
+
+    return results
+
+
+def benchmark_counterbalance(nr_trials: int, factor_levels: list[int], repeat: int):
+    params = {"trials": nr_trials, "factor_levels": factor_levels}
+    samples = time_calls(
+        lambda: counterbalance(nr_trials, list(factor_levels), force=True), repeat
+    )
+    return [summarize("counterbalance", params, samples)]
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    components: list[int],
+    trials: int,
+    factor_levels: list[int],
+    repeat: int,
+    refresh_rate: float,
+) -> dict:
+    Window.start({"winType": "virtual", "refresh_rate": refresh_rate})
+    DataHandler.start_participant_data(
+        "Benchmark", {"participant": "0"}, _save=False, _dlg=False
+    )
+
+    trial_values_list = create_trial_values(trials, factor_levels)
+    results = []
+    for nr_components in components:
+        results.extend(benchmark_trial(nr_components, trial_values_list, repeat))
+    results.extend(benchmark_counterbalance(trials, factor_levels, repeat))
+
+    DataHandler.abort()
+    Window.turnoff()
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": get_git_commit(),
+            "python": platform.python_version(),
+            "psychopy": psychopy_version,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "refresh_rate": refresh_rate,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--components", type=int, nargs="+", default=[1, 20, 100])
+    parser.add_argument("--trials", type=int, default=96)
+    parser.add_argument("--factor-levels", type=int, nargs="+", default=[2, 2])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--refresh-rate", type=float, default=60.0)
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+
+    report = run(
+        args.components, args.trials, args.factor_levels, args.repeat, args.refresh_rate
+    )
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for result in report["results"]:
+        print(
+            f"{result['name']:<30} {json.dumps(result['params']):<45} "
+            f"mean {result['mean'] * 1e6:>10.1f} us   max {result['max'] * 1e6:>10.1f} us"
+        )
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,10 @@ def default_data():
         "time_stopped": None,
         "time_stopped_flip": None,
         "time_stopped_global_flip": None,
+        "onset_error_frames": None,
+        "offset_error_frames": None,
+        "applied_sets": 0,
+        "skipped_sets": 0,
     }
 
 
@@ -0,0 +1,14 @@
+import pytest
+
+from conflict_task.devices.window import Window
+
+
+@pytest.fixture
+def virtual_window(request):
+    settings = {"winType": "virtual", "size": (800, 600), "refresh_rate": 100.0}
+    if hasattr(request, "param"):
+        settings.update(request.param)
+
+    Window.start(settings)
+    yield Window._window
+    Window.turnoff()
@@ -139,6 +139,21 @@ def test_prepare_component(component: BaseComponent):
     assert getattr(component, "factor_name") == "factor_value"
 
 
+@pytest.mark.parametrize(
+    "component",
+    [{"variable": {"factor_name": "factor_id", "other_name": "other_id"}}],
+    indirect=True,
+)
+def test_prepare_component_skips_values_already_set(component: BaseComponent):
+    component.prepare({"factor_id": "factor_value", "other_id": 1})
+    assert (component.applied_sets, component.skipped_sets) == (2, 0)
+
+    component.refresh()
+    component.prepare({"factor_id": "factor_value", "other_id": 2})
+    assert (component.applied_sets, component.skipped_sets) == (1, 1)
+    assert getattr(component, "other_name") == 2
+
+
 @pytest.mark.parametrize(
     "component", [{"variable": {"factor_name": "factor_id"}}], indirect=True
 )
@@ -152,3 +167,29 @@ def test_prepare_component_fail(
         "Subject trial sequence does not include key 'factor_id' required by UNKNOWN_COMPONENT"
         in capsys.readouterr().out
     )
+
+
+def test_record_timing_errors_in_frames(new_component):
+    component = new_component({"start": 1.0, "stop": 1.133})
+
+    component.start(1.0, 1.0 + 1 / 60, 11.0)
+    component.stop(1.15, 1.15, 11.15)
+    component.record_timing_errors(1 / 60)
+
+    assert component.onset_error_frames == 1
+    assert component.offset_error_frames == 1
+
+    component.refresh()
+
+    assert component.onset_error_frames is None
+    assert component.offset_error_frames is None
+
+
+def test_record_timing_errors_without_stop_time(new_component):
+    component = new_component({"start": 0.5})
+
+    component.start(0.5, 0.5, 10.5)
+    component.record_timing_errors(1 / 60)
+
+    assert component.onset_error_frames == 0
+    assert component.offset_error_frames is None
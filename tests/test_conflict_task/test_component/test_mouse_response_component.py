@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from conflict_task.component import MouseResponseComponent
+from conflict_task.component.mouse_response_component import summarize_trajectory
+from conflict_task.devices import DataHandler, Window
+from conflict_task.devices.virtual_window import VirtualMouse
+from conflict_task.sequence import Sequence
+
+
+class MovingMouse(VirtualMouse):
+    """Moves from the bottom of the screen to the right target in 20 samples."""
+
+    def __init__(self):
+        super().__init__()
+        self.path = iter(np.linspace((0.0, -0.5), (0.5, 0.5), 20))
+
+    def getPos(self):
+        return next(self.path, (0.5, 0.5))
+
+
+def test_trajectory_summary():
+    trajectory = np.array(
+        [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [0.2, 0.3, 0.4], [0.3, 0.0, 1.0]],
+        dtype=np.float32,
+    )
+
+    summary = summarize_trajectory(trajectory)
+
+    assert summary["initiation_time"] == pytest.approx(0.2)
+    assert summary["path_length"] == pytest.approx(0.5 + np.hypot(0.3, 0.6))
+    assert summary["max_deviation"] == pytest.approx(0.3)
+    assert (summary["final_x"], summary["final_y"]) == pytest.approx((0.0, 1.0))
+
+
+def test_mouse_target_ends_sequence(virtual_window, tmp_path, monkeypatch):
+    monkeypatch.setattr(DataHandler, "filename", str(tmp_path / "participant"))
+    sequence = Sequence(
+        {
+            "name": "Tracking",
+            "response": {
+                "type": "mouse",
+                "keys": ["left", "right"],
+                "targets": {"left": [-0.5, 0.5, 0.1], "right": [0.5, 0.5, 0.1]},
+                "stop": 1.0,
+            },
+            "cut_on_response": True,
+        }
+    )
+    response: MouseResponseComponent = sequence.response
+    response.mouse = MovingMouse()
+    assert sequence.run({})
+
+    data = sequence.get_data(prepend_key=False)
+    assert data["key"] == "right"
+    # The path is inside the target's radius one sample before its end
+    assert data["samples"] == 19
+    assert data["final_x"] == pytest.approx(0.5, abs=0.05)
+
+    trajectory = np.load(data["trajectory_file"])
+    assert trajectory.dtype == np.float32
+    assert trajectory.shape == (data["samples"], 3)
+
+
+def test_buffer_fits_a_stop_in_frames(virtual_window):
+    response = MouseResponseComponent(
+        {"name": "mouse", "keys": ["left"], "start_frames": 10, "duration_frames": 30}
+    )
+    response.freeze()
+
+    # 30 frames at 100 Hz, where the stop time in seconds is infinite
+    assert response._get_capacity() == 32
+
+
+def test_cursor_is_visible_unless_hidden(virtual_window):
+    shown = MouseResponseComponent({"name": "shown", "keys": ["left"], "stop": 1.0})
+    hidden = MouseResponseComponent(
+        {"name": "hidden", "keys": ["left"], "stop": 1.0, "cursor_visible": False}
+    )
+    for response in (shown, hidden):
+        response.freeze()
+        response.start(0.0, 0.0, 0.0)
+
+    assert shown.mouse.getVisible()
+    assert not hidden.mouse.getVisible()
+
+
+def test_cursor_visibility_is_restored_on_stop(virtual_window):
+    response = MouseResponseComponent({"name": "mouse", "keys": ["left"], "stop": 1.0})
+    response.freeze()
+    assert not Window.get_mouse_visible()
+
+    response.start(0.0, 0.0, 0.0)
+    assert Window.get_mouse_visible()
+
+    response.stop(1.0, 1.0, 1.0)
+    assert not Window.get_mouse_visible()
+
+    response.refresh()
+    response.start(0.0, 0.0, 0.0)
+    assert Window.get_mouse_visible()
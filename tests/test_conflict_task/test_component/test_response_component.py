@@ -1,6 +1,10 @@
 import pytest
 
-from conflict_task.component import CorrectResponseComponent, ResponseComponent
+from conflict_task.component import (
+    CorrectResponseComponent,
+    ResponseComponent,
+    summarize_latencies,
+)
 
 
 def test_response_has_no_keys(capsys: pytest.CaptureFixture):
@@ -62,3 +66,37 @@ def test_correct_answer_valid_correct_key():
     )
 
     assert response.variable_factor["correct_key"] == "correct"
+
+
+def test_latency_summary_skips_missed_responses():
+    response_data = [
+        {
+            "response_latency_poll": 0.001 * i,
+            "response_latency_flip": 0.01,
+            "response_latency_total": 0.01 + 0.001 * i,
+        }
+        for i in range(1, 101)
+    ]
+    response_data.append({"response_latency_poll": None})
+
+    summary = summarize_latencies(response_data, percentiles=(50, 99))
+
+    assert summary["responses"] == 100
+    assert summary["latency_poll_p50"] == pytest.approx(0.0505)
+    assert summary["latency_flip_p99"] == pytest.approx(0.01)
+    assert summarize_latencies([])["latency_total_p90"] is None
+
+
+def test_correct_key_is_set_again_when_repeated():
+    response = CorrectResponseComponent(
+        {"keys": ["f", "j"], "variable": {"correct_key": "correct"}}
+    )
+    response.freeze()
+
+    correct_keys = []
+    for key in ["j", "j", "f", "f"]:
+        response.refresh()
+        response.prepare({"correct": key})
+        correct_keys.append(response.correct_key)
+
+    assert correct_keys == ["j", "j", "f", "f"]
@@ -0,0 +1,71 @@
+import pytest
+from PIL import Image
+
+from conflict_task.component import VisualComponent
+from conflict_task.component.texture_cache import TextureCache, estimate_texture_bytes
+
+
+def create_cache(budget: int) -> TextureCache:
+    return TextureCache(
+        lambda image: f"stimulus:{image}", budget, estimate=lambda image: 10
+    )
+
+
+def test_cache_creates_on_first_use_and_counts_hits():
+    cache = create_cache(budget=100)
+
+    assert cache["a"] == "stimulus:a"
+    assert cache["a"] == "stimulus:a"
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+    assert cache.used == 10
+
+
+def test_cache_evicts_least_recently_used():
+    cache = create_cache(budget=20)
+
+    cache["a"]
+    cache["b"]
+    cache["a"]
+    cache["c"]
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.evictions == 1
+    assert cache.used == 20
+
+
+def test_prefetch_stops_at_budget():
+    cache = create_cache(budget=20)
+    cache.prefetch(["a", "b", "c"])
+
+    assert len(cache) == 2
+    assert cache.misses == 0
+    assert cache.evictions == 0
+
+
+def test_estimate_reads_image_size(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (8, 4)).save(path)
+
+    assert estimate_texture_bytes(str(path)) == 8 * 4 * 4
+    assert estimate_texture_bytes(str(tmp_path / "missing.png")) == 0
+
+
+def test_image_component_loads_lazily(virtual_window):
+    component = VisualComponent(
+        {
+            "name": "picture",
+            "type": "image",
+            "spec": {"image": "fixation.png"},
+            "texture_budget": 1.0,
+            "variable": {"image": "picture"},
+        }
+    )
+    component.freeze()
+    component.build_pool([{"picture": "cat.png"}, {"picture": "dog.png"}])
+    component.prepare({"picture": "dog.png"})
+
+    assert component.component.image == "dog.png"
+    data = component.get_data()
+    assert data["picture.texture_cache.hits"] == 1
+    assert data["picture.texture_cache.misses"] == 1
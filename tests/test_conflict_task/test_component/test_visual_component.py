@@ -78,3 +78,67 @@ def test_all_settings_are_set(win: Window):
     assert all(a == b for a, b in zip(component.component.pos, [1.0, 2.0]))
     assert all(a == b for a, b in zip(component.component.color, [1.0, 1.0, 1.0]))
     assert component.component.height == 0.05
+
+
+def create_flanker(pool_cap: int = STIMULUS_POOL_CAP) -> VisualComponent:
+    component = VisualComponent(
+        {
+            "name": "flanker",
+            "type": "text",
+            "variable": {"text": "flanker_text"},
+            "pool_cap": pool_cap,
+        }
+    )
+    component.freeze()
+    return component
+
+
+def test_text_pool_swaps_prebuilt_stimuli(virtual_window):
+    component = create_flanker()
+    trial_values_list = [{"flanker_text": text} for text in ["<<<<<", ">>>>>", "<<<<<"]]
+    component.build_pool(trial_values_list)
+
+    assert set(component.pool) == {("<<<<<",), (">>>>>",)}
+
+    component.prepare({"flanker_text": ">>>>>"})
+    assert component.component is component.pool[(">>>>>",)]
+    assert component.component.text == ">>>>>"
+
+
+def test_text_pool_falls_back_to_live_layout_over_cap(virtual_window):
+    component = create_flanker(pool_cap=1)
+    trial_values_list = [{"flanker_text": text} for text in [">>>>>", "<<<<<", ">>>>>"]]
+    component.build_pool(trial_values_list)
+
+    assert list(component.pool) == [(">>>>>",)]
+
+    component.prepare({"flanker_text": "<<<<<"})
+    assert component.component is component.live_component
+    assert component.component.text == "<<<<<"
+
+
+def test_pool_keys_on_every_variable_factor(virtual_window):
+    component = VisualComponent(
+        {
+            "name": "target",
+            "type": "Rect",
+            "use_norm": True,
+            "spec": {"width": 0.1, "height": 0.1},
+            "variable": {"fillColor": "color", "pos": "position"},
+        }
+    )
+    component.freeze()
+    component.build_pool(
+        [
+            {"color": "red", "position": (-0.5, 0.0)},
+            {"color": "red", "position": (0.5, 0.0)},
+            {"color": "green", "position": (-0.5, 0.0)},
+        ]
+    )
+
+    assert len(component.pool) == 3
+
+    component.prepare({"color": "green", "position": (-0.5, 0.0)})
+    assert component.component is component.pool[("green", (-0.5, 0.0))]
+    assert component.component.fillColor == "green"
+    assert component.component.width == 0.1
@@ -0,0 +1,44 @@
+import pytest
+from psychopy import clock
+
+from conflict_task.devices import EMGConnector
+
+
+class RecordingPort:
+    def __init__(self):
+        self.writes = []
+
+    def setData(self, data):
+        self.writes.append((data, clock.getTime()))
+
+
+@pytest.fixture
+def port(monkeypatch):
+    port = RecordingPort()
+    monkeypatch.setattr(EMGConnector, "port", port, raising=False)
+    monkeypatch.setattr(EMGConnector, "_connected", True)
+    yield port
+    EMGConnector.stop()
+
+
+def test_async_marker_sets_pins_without_waiting(port: RecordingPort):
+    start = clock.getTime()
+    EMGConnector.send_marker_async(7, t=0.01)
+    returned = clock.getTime() - start
+
+    assert port.writes[0][0] == 7
+    assert returned < 0.005
+
+    EMGConnector.flush()
+    assert [data for data, _ in port.writes] == [7, 0]
+    assert EMGConnector.pulse_widths[-1] == pytest.approx(0.01, abs=0.002)
+
+
+def test_async_markers_do_not_overlap(port: RecordingPort):
+    EMGConnector.send_marker_async(1, t=0.005)
+    EMGConnector.send_marker_async(2, t=0.005)
+    EMGConnector.flush()
+
+    assert [data for data, _ in port.writes] == [1, 0, 2, 0]
+    (_, first_end), (_, second_start) = port.writes[1], port.writes[2]
+    assert second_start - first_end >= 0.005
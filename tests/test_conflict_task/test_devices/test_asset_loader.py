@@ -0,0 +1,51 @@
+import pytest
+from PIL import Image
+
+from conflict_task.component import VisualComponent
+from conflict_task.devices import AssetLoader
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"image_{i}.png"
+        Image.new("RGB", (4 + i, 4)).save(path)
+        paths.append(str(path))
+    yield paths
+    AssetLoader.shutdown()
+
+
+def test_upload_hands_over_in_batches_and_in_order(images):
+    decoded = []
+    for path in images:
+        AssetLoader.load(path, decoded.append)
+
+    assert AssetLoader.upload(batch_size=2, block=True) == 2
+    assert AssetLoader.pending() == 1
+
+    AssetLoader.finish()
+    assert [image.size for image in decoded] == [(4, 4), (5, 4), (6, 4)]
+    assert all(image.mode == "RGBA" for image in decoded)
+
+
+def test_async_preload_fills_preload_on_upload(images, virtual_window):
+    component = VisualComponent(
+        {
+            "name": "picture",
+            "type": "image",
+            "preload": images,
+            "async_preload": True,
+            "variable": {"image": "picture"},
+        }
+    )
+    component.freeze()
+
+    assert component.variable_image == "picture"
+
+    # Preparing before the upload waits for the loader
+    component.prepare({"picture": images[1]})
+
+    assert set(component.preload) == set(images)
+    assert component.component is component.preload[images[1]]
+    assert component.component.image.size == (5, 4)
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from psychopy import clock
+
+from conflict_task.devices import BufferedKeyboard
+
+
+class FakeKeyPress:
+    def __init__(self, name: str, rt: float):
+        self.name = name
+        self.rt = rt
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.clock = clock.Clock()
+        self.presses = []
+
+    def press(self, name: str, rt: float):
+        self.presses.append(FakeKeyPress(name, rt))
+
+    def getKeys(self, clear=True):
+        presses, self.presses = self.presses, []
+        return presses
+
+
+@pytest.fixture
+def device():
+    device = FakeKeyboard()
+    BufferedKeyboard.start(device, threaded=False)
+    yield device
+    BufferedKeyboard.stop()
+    BufferedKeyboard._device = None
+
+
+def test_presses_are_read_once_and_filtered(device: FakeKeyboard):
+    device.press("a", 0.1)
+    device.press("f", 0.2)
+
+    assert BufferedKeyboard.was_key_pressed(["f"])
+    assert BufferedKeyboard.get_last_key(["f", "j"]) == ("f", pytest.approx(0.2))
+    assert BufferedKeyboard.get_last_key(["f", "j"]) is None
+    assert BufferedKeyboard.get_keys([]) == [("a", pytest.approx(0.1))]
+    assert BufferedKeyboard.get_keys([]) == []
+
+
+def test_press_times_follow_clock_resets(device: FakeKeyboard):
+    device.press("f", 0.5)
+    BufferedKeyboard.get_keys(["j"])
+
+    BufferedKeyboard.reset_clock(new_t=-1.0)
+    assert BufferedKeyboard.get_last_key(["f"])[1] == pytest.approx(0.5 + 1.0, abs=0.01)
+
+
+def test_old_records_are_overwritten(device: FakeKeyboard, monkeypatch):
+    monkeypatch.setattr(BufferedKeyboard, "capacity", 4)
+    BufferedKeyboard.start(device, threaded=False)
+
+    for rt in range(6):
+        device.press("f", float(rt))
+
+    assert [rt for _, rt in BufferedKeyboard.get_keys(["f"])] == pytest.approx(
+        [2.0, 3.0, 4.0, 5.0], abs=0.01
+    )
+    assert BufferedKeyboard.ring.overflows == 2
+
+
+def test_collector_thread_drains_device():
+    device = FakeKeyboard()
+    BufferedKeyboard.start(device, threaded=True)
+    device.press("f", 0.1)
+
+    deadline = time.monotonic() + 1.0
+    while BufferedKeyboard.ring.write == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    BufferedKeyboard.stop()
+    assert device.presses == []
+    assert BufferedKeyboard.get_keys(["f"]) == [("f", pytest.approx(0.1, abs=0.01))]
+    BufferedKeyboard._device = None
@@ -0,0 +1,45 @@
+from conflict_task.devices import DataHandler
+
+
+def test_only_typed_columns_keep_their_type(monkeypatch):
+    added = {}
+    monkeypatch.setattr(
+        DataHandler, "add_data", lambda key, value: added.update({key: value})
+    )
+
+    DataHandler.add_data_dict(
+        {
+            "Trial.response.response_rt": None,
+            "Trial.text.text": "<\n",
+            "Trial.text.onset_error_frames": None,
+            "Trial.dropped_frames": 2,
+        }
+    )
+
+    assert added == {
+        "Trial.response.response_rt": "None",
+        "Trial.text.text": "<\\n",
+        "Trial.text.onset_error_frames": None,
+        "Trial.dropped_frames": 2,
+    }
+
+
+def test_latency_summary_columns_keep_their_type(monkeypatch):
+    added = {}
+    monkeypatch.setattr(
+        DataHandler, "add_data", lambda key, value: added.update({key: value})
+    )
+
+    DataHandler.add_data_dict(
+        {
+            "latency_summary.responses": 3,
+            "latency_summary.latency_total_p90": 0.02,
+            "Trial.responses": 3,
+        }
+    )
+
+    assert added == {
+        "latency_summary.responses": 3,
+        "latency_summary.latency_total_p90": 0.02,
+        "Trial.responses": "3",
+    }
@@ -0,0 +1,86 @@
+import pytest
+
+from conflict_task.component import ResponseComponent
+from conflict_task.devices import INPUT_DEVICES, BufferedKeyboard, InputDevice
+from conflict_task.devices.input_device import InputDeviceBase, Keyboard
+
+from .test_buffered_keyboard import FakeKeyboard
+
+
+class CountingDevice(InputDeviceBase):
+    presses: list = []
+    reads: int = 0
+
+    @classmethod
+    def get_keys(cls, keys, wait_for_release=False, clear=True):
+        cls.reads += 1
+        presses, cls.presses = cls.presses, []
+        return presses
+
+    @classmethod
+    def reset_clock(cls, new_t=0.0):
+        pass
+
+    @classmethod
+    def get_time(cls):
+        return 1.0
+
+    @classmethod
+    def reset_events(cls):
+        cls.presses = []
+
+
+@pytest.fixture
+def device():
+    INPUT_DEVICES["CountingDevice"] = CountingDevice
+    InputDevice.select("CountingDevice")
+    CountingDevice.reads = 0
+    yield CountingDevice
+    del INPUT_DEVICES["CountingDevice"]
+    InputDevice.select(Keyboard)
+
+
+def test_one_poll_feeds_every_consumer(device):
+    response = ResponseComponent({"name": "response", "keys": ["f", "j"]})
+    response.freeze()
+    response.start(0.0, 0.0, 0.0)
+
+    device.presses = [("a", 0.1), ("f", 0.2)]
+    InputDevice.poll()
+
+    # The quit check does not hide presses from the response...
+    assert not InputDevice.was_key_pressed(["escape"], poll=False)
+    assert response.check() == ("f", 0.2)
+    # ...and the response leaves other presses for the post-response log
+    assert InputDevice.get_keys([]) == [("a", 0.1)]
+    assert InputDevice.get_keys([]) == []
+    assert device.reads == 3
+
+
+def test_frame_reads_only_scan_new_records(device):
+    device.presses = [("f", 0.1)]
+    InputDevice.poll()
+    InputDevice.poll()
+
+    # The press was new on the previous poll, but is still there for other reads
+    assert InputDevice.get_last_key(["f"], poll=False) is None
+    assert InputDevice.get_keys(["f"], poll=False) == []
+    assert InputDevice.get_keys(["f"]) == [("f", 0.1)]
+
+
+def test_ring_devices_are_read_without_copying(monkeypatch):
+    keyboard = FakeKeyboard()
+    BufferedKeyboard.start(keyboard, threaded=False)
+    monkeypatch.setattr(BufferedKeyboard, "start", classmethod(lambda cls: None))
+    InputDevice.select(BufferedKeyboard)
+
+    keyboard.press("escape", 0.1)
+    InputDevice.poll()
+
+    assert InputDevice._ring is BufferedKeyboard.ring
+    assert InputDevice.was_key_pressed(["escape"], poll=False)
+    assert InputDevice.get_keys([]) == [("escape", pytest.approx(0.1))]
+
+    monkeypatch.undo()
+    BufferedKeyboard._device = None
+    InputDevice.select(Keyboard)
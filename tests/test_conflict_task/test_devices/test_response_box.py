@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from conflict_task.constants import RESPONSE_BOX_MIN_POLL_RATE
+from conflict_task.devices import InputDevice, ResponseBox
+from conflict_task.devices.input_device import Keyboard
+from conflict_task.devices.response_box import FakeParallelPort
+
+
+def wait_for_polls(polls: int = 20) -> None:
+    target = ResponseBox.polls + polls
+    deadline = time.monotonic() + 2.0
+    while ResponseBox.polls < target and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def port():
+    # Buttons pull their pins low
+    port = FakeParallelPort({10: 1, 11: 1})
+    ResponseBox.configure(port=port)
+    InputDevice.select("ResponseBox")
+    yield port
+    ResponseBox.stop()
+    ResponseBox.configure()
+    InputDevice.select(Keyboard)
+
+
+def test_button_edges_become_key_presses(port: FakeParallelPort):
+    ResponseBox.reset_clock()
+    port.set_pin(11, 0)
+    wait_for_polls()
+    port.set_pin(11, 1)
+    port.set_pin(10, 0)
+    wait_for_polls()
+
+    presses = ResponseBox.get_keys(["f", "j"])
+    assert [key for key, _ in presses] == ["j", "f"]
+    assert 0.0 < presses[0][1] < presses[1][1] < 2.0
+
+    # Holding a button down is a single press
+    wait_for_polls()
+    assert ResponseBox.get_keys(["f", "j"]) == []
+
+
+def test_presses_are_timed_on_the_keyboard_clock(port: FakeParallelPort):
+    Keyboard.reset_clock(new_t=-1.0)
+    port.set_pin(10, 0)
+    wait_for_polls()
+
+    key, rt = ResponseBox.get_last_key(["f"])
+    assert 1.0 < rt < Keyboard.get_time()
+
+
+def test_poller_runs_at_least_at_the_minimum_rate(port: FakeParallelPort):
+    # The main thread keeps the GIL busy, like a frame loop
+    end = time.perf_counter() + 0.2
+    while time.perf_counter() < end:
+        pass
+    ResponseBox.stop()
+
+    assert ResponseBox.achieved_rate >= RESPONSE_BOX_MIN_POLL_RATE
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from conflict_task.devices import InputDevice, SimulatedParticipant
+from conflict_task.devices.input_device import Keyboard
+from conflict_task.sequence import Trial
+
+
+@pytest.fixture
+def participant():
+    InputDevice.select("SimulatedParticipant")
+    SimulatedParticipant.reset_clock()
+    SimulatedParticipant.reset_events()
+    yield SimulatedParticipant
+    SimulatedParticipant.configure()
+    InputDevice.select(Keyboard)
+
+
+def test_scripted_press_appears_at_its_time(participant):
+    participant.configure(script=[("f", 0.2)])
+
+    participant.open_response_window(["f", "j"], onset=1.0)
+    assert participant.get_keys(["f", "j"]) == []
+
+    # Clocks are reset to read minus `new_t`
+    participant.reset_clock(new_t=-1.3)
+    assert participant.get_last_key(["f", "j"]) == ("f", 1.2)
+    assert participant.get_keys(["f", "j"]) == []
+
+
+def test_script_none_means_no_response(participant):
+    participant.configure(script=[None])
+    participant.open_response_window(["f"], onset=0.0)
+    participant.reset_clock(new_t=-10.0)
+
+    assert not participant.was_key_pressed(["f"])
+
+
+def test_model_congruency_effect_and_errors(participant):
+    participant.configure(
+        model={"error_rate": 0.0, "error_rate_incongruent": 1.0}, seed=1
+    )
+
+    def response(congruency):
+        participant.prepare({"congruency": congruency})
+        return participant._draw_response(["f", "j"], "f")
+
+    congruent = [response(0) for _ in range(500)]
+    incongruent = [response(1) for _ in range(500)]
+
+    assert all(key == "f" for key, _ in congruent)
+    assert all(key == "j" for key, _ in incongruent)
+    assert np.mean([rt for _, rt in incongruent]) > np.mean([rt for _, rt in congruent])
+
+
+def test_unknown_model_setting(participant, capsys: pytest.CaptureFixture):
+    with pytest.raises(SystemExit):
+        participant.configure(model={"speed": 1.0})
+
+    assert "SimulatedParticipant: Unknown model settings" in capsys.readouterr().out
+
+
+def test_trial_runs_with_simulated_participant(participant, virtual_window):
+    participant.configure(script=[("j", 0.3)])
+
+    trial = Trial(
+        {
+            "name": "Simulated",
+            "visual": [
+                {
+                    "name": "target",
+                    "type": "text",
+                    "spec": {},
+                    "variable": {"text": "text"},
+                    "stop": 0.5,
+                }
+            ],
+            "response": {
+                "correct": True,
+                "keys": ["f", "j"],
+                "start": 0.5,
+                "stop": 2.0,
+            },
+            "cut_on_response": True,
+        }
+    )
+    assert trial.run({"text": "<", "correct_key": "j"})
+
+    response = trial.response.get_response_data()
+    assert response["response_made"]
+    assert response["response_key"] == "j"
+    assert response["response_correct"]
+    assert response["response_rt"] == pytest.approx(0.8, abs=1e-3)
+
+    # The press is seen on the first frame after it is due, and shown on that frame's flip
+    frame_period = 1 / 60
+    assert 0.0 <= response["response_latency_poll"] <= frame_period + 0.005
+    assert 0.0 <= response["response_latency_flip"] <= frame_period + 0.005
+    assert response["response_time_flip"] == pytest.approx(
+        response["response_rt"] + response["response_latency_total"]
+    )
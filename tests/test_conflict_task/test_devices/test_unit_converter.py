@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from conflict_task.component import VisualComponent
+from conflict_task.devices import UnitConverter, Window
+
+
+@pytest.fixture(autouse=True)
+def clear_conversions():
+    UnitConverter.clear()
+
+
+def test_column_is_converted_once_and_cached(virtual_window, monkeypatch):
+    UnitConverter.convert_column("pix2norm_size", [[80, 60], [160, 120], [80, 60]])
+
+    def fail(pix):
+        raise AssertionError("Conversion should come from the cache")
+
+    monkeypatch.setattr(Window, "pix2norm_size", fail)
+    assert np.allclose(UnitConverter.convert("pix2norm_size", [160, 120]), [0.2, 0.2])
+    assert np.allclose(UnitConverter.convert("pix2norm_size", (80, 60)), [0.1, 0.1])
+
+
+@pytest.mark.parametrize(
+    "conversion, values",
+    [
+        ("pix2norm_size", [40, 80, 160]),
+        ("pix2norm_size", [40, [80, 60], 160, (160, 120)]),
+        ("pt2norm_size", [12, 24, 30]),
+    ],
+)
+def test_scalar_and_mixed_columns_convert_like_single_values(
+    virtual_window, conversion, values
+):
+    UnitConverter.convert_column(conversion, values)
+
+    for value in values:
+        expected = getattr(Window, conversion)(np.array(value, dtype=float))
+        converted = UnitConverter.convert(conversion, value)
+        assert np.shape(converted) == np.shape(expected)
+        assert np.allclose(converted, expected)
+
+
+def test_cache_is_keyed_by_window_size(virtual_window):
+    assert UnitConverter.convert("pt2norm_size", 30) == pytest.approx(40 / 600 * 2)
+
+    virtual_window.size = np.array((800, 400))
+    assert UnitConverter.convert("pt2norm_size", 30) == pytest.approx(40 / 400 * 2)
+
+
+def test_text_size_is_converted_without_touching_trial_values(virtual_window):
+    component = VisualComponent(
+        {
+            "name": "word",
+            "type": "text",
+            "variable": {"text": "word", "size": "font_size"},
+        }
+    )
+    component.freeze()
+
+    trial_values = {"word": "RED", "font_size": 30}
+    component.build_pool([trial_values])
+    component.pool = None  # Prepare live instead of from the pool
+    component.prepare(trial_values)
+
+    assert component.component.height == pytest.approx(40 / 600 * 2)
+    assert trial_values == {"word": "RED", "font_size": 30}
+
+
+@pytest.mark.parametrize(
+    "settings, converted",
+    [
+        ({"type": "Rect", "use_norm": True}, True),
+        ({"type": "shape"}, False),
+        ({"type": "Rect", "use_norm": True, "match_spec_units": True}, False),
+        ({"type": "shape", "match_spec_units": True}, True),
+    ],
+)
+def test_shape_size_conversion_is_opt_in(virtual_window, settings, converted):
+    component = VisualComponent(
+        {"name": "frame", "variable": {"size": "frame_size"}, **settings}
+    )
+
+    assert ("size" in component.unit_conversions) == converted
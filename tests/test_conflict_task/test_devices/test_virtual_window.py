@@ -0,0 +1,98 @@
+import pytest
+from psychopy import clock
+
+from conflict_task.devices import Window
+from conflict_task.devices.virtual_window import VirtualStim, VirtualWindow
+from conflict_task.sequence import Sequence
+
+
+def test_window_starts_virtual(virtual_window: VirtualWindow):
+    assert Window.virtual
+    assert isinstance(virtual_window, VirtualWindow)
+    assert Window.get_frame_period() == pytest.approx(0.01)
+
+
+def test_flips_follow_simulated_vsync(virtual_window: VirtualWindow):
+    timer = clock.Clock()
+    first = Window.flip()
+    predicted = Window.get_future_flip_time()
+    second = Window.flip()
+
+    assert second == pytest.approx(predicted)
+    assert second - first == pytest.approx(0.01)
+    assert timer.getTime() == pytest.approx(0.02, abs=0.005)
+
+
+def test_fast_mode_skips_waits(virtual_window: VirtualWindow):
+    from conflict_task.devices import WaitScheduler
+
+    timer = clock.Clock()
+    WaitScheduler.wait(5.0)
+
+    assert timer.getTime() >= 5.0
+
+
+def test_stimuli_are_virtual_and_drawn(virtual_window: VirtualWindow):
+    stimulus = Window.create_stimulus("TextStim", {"text": "<<<<<"})
+    stimulus.setAutoDraw(True)
+    Window.flip()
+    stimulus.setAutoDraw(False)
+    Window.flip()
+
+    assert isinstance(stimulus, VirtualStim)
+    assert stimulus.text == "<<<<<"
+    assert virtual_window.draw_calls == 1
+
+
+def test_sequence_runs_on_virtual_window(virtual_window: VirtualWindow):
+    sequence = Sequence(
+        {
+            "name": "Virtual",
+            "visual": [
+                {"name": "text", "type": "text", "spec": {"text": "+"}, "stop": 0.5}
+            ],
+        }
+    )
+
+    assert sequence.run({})
+
+    data = sequence.get_data()
+    assert data["Virtual.text.time_stopped_flip"] == pytest.approx(0.5, abs=0.011)
+    assert data["Virtual.dropped_frames"] == 0
+    assert virtual_window.frames == pytest.approx(50, abs=2)
+
+
+def test_dropped_frames_count_persistent_stimuli(
+    virtual_window: VirtualWindow, monkeypatch
+):
+    sequence = Sequence(
+        {
+            "name": "Persistent",
+            "persistent": [{"name": "fixation", "type": "text", "spec": {"text": "+"}}],
+            "visual": [
+                {
+                    "name": "text",
+                    "type": "text",
+                    "spec": {"text": "<"},
+                    "start": 0.2,
+                    "stop": 0.3,
+                }
+            ],
+        }
+    )
+
+    # Drop three frames while only the persistent fixation is on screen
+    flip = virtual_window.flip
+
+    def slow_flip(*args, **kwargs):
+        if virtual_window.frames == 5:
+            virtual_window._skip(3 * Window.get_frame_period())
+        return flip(*args, **kwargs)
+
+    monkeypatch.setattr(virtual_window, "flip", slow_flip)
+
+    sequence.start_persistent()
+    assert sequence.run({})
+    sequence.stop_persistent()
+
+    assert sequence.get_data()["Persistent.dropped_frames"] == 3
@@ -0,0 +1,40 @@
+from psychopy import clock
+
+from conflict_task.devices.wait_scheduler import (
+    MAXIMUM_SPIN_MARGIN,
+    MINIMUM_SPIN_MARGIN,
+    WaitScheduler,
+)
+
+
+def test_calibrate_sets_spin_margin():
+    margin = WaitScheduler.calibrate(samples=5)
+
+    assert WaitScheduler.calibrated
+    assert MINIMUM_SPIN_MARGIN <= margin <= MAXIMUM_SPIN_MARGIN
+    assert WaitScheduler.spin_margin == margin
+
+
+def test_wait_does_not_end_early():
+    start = clock.getTime()
+    WaitScheduler.wait(0.02)
+
+    assert clock.getTime() - start >= 0.02
+
+
+def test_wait_until_uses_given_clock():
+    timer = clock.Clock()
+    # A PsychoPy clock reads -newT after a reset, so this one reads 5 s
+    timer.reset(newT=-5.0)
+    start = clock.getTime()
+    WaitScheduler.wait_until(5.01, timer=timer)
+
+    assert timer.getTime() >= 5.01
+    assert 0.0 < clock.getTime() - start < 0.5
+
+
+def test_wait_until_past_target_returns_immediately():
+    start = clock.getTime()
+    WaitScheduler.wait_until(start - 1.0)
+
+    assert clock.getTime() - start < 0.01
@@ -0,0 +1,53 @@
+import pytest
+from psychopy import core
+
+from conflict_task.devices import EMGConnector, Window
+
+from .test_EMG_connector import RecordingPort
+
+
+def test_after_flip_tasks_run_after_the_flip(virtual_window):
+    ran = []
+    Window.after_flip(lambda: ran.append(virtual_window.frames))
+    Window.after_flip(ran.append, "second")
+
+    assert ran == []
+
+    tasks = Window.deferred_tasks
+    Window.flip()
+
+    assert ran == [1, "second"]
+    assert Window.deferred_tasks == tasks + 2
+
+
+def test_after_flip_tasks_are_carried_over_when_out_of_budget(virtual_window):
+    # Each task takes the whole frame, so only one fits in a frame
+    def slow_task(name):
+        ran.append(name)
+        virtual_window._skip(Window.get_frame_period())
+
+    ran = []
+    for name in ["first", "second", "third"]:
+        Window.after_flip(slow_task, name)
+
+    Window.flip()
+    assert ran == ["first"]
+
+    Window.flip()
+    assert ran == ["first", "second"]
+
+    Window.run_after_flip()
+    assert ran == ["first", "second", "third"]
+
+
+def test_quit_sends_markers_waiting_for_a_flip(virtual_window, monkeypatch):
+    port = RecordingPort()
+    monkeypatch.setattr(EMGConnector, "port", port, raising=False)
+    monkeypatch.setattr(EMGConnector, "_connected", True)
+    monkeypatch.setattr(core, "quit", lambda: None)
+
+    Window.after_flip(EMGConnector.send_marker_async, 9)
+    Window.quit()
+
+    assert [data for data, _ in port.writes] == [9, 0]
+    assert EMGConnector._worker is None
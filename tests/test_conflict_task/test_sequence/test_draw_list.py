@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from conflict_task.devices import Window
+from conflict_task.sequence import Sequence
+
+
+@pytest.fixture
+def sequence(virtual_window):
+    return Sequence(
+        {
+            "name": "Drawn",
+            "persistent": [{"name": "frame", "type": "Rect", "depth": 1.0}],
+            "visual": [
+                {"name": "target", "type": "text", "stop": 0.1},
+                {"name": "fixation", "type": "text", "stop": 0.05, "depth": 0.5},
+            ],
+        }
+    )
+
+
+def test_draw_list_is_ordered_back_to_front(sequence: Sequence):
+    assert [component.name for component in sequence.draw_list] == [
+        "frame",
+        "fixation",
+        "target",
+    ]
+    assert not any(component.auto_draw for component in sequence.draw_list)
+
+
+def test_sequence_draws_visible_components_without_auto_draw(
+    sequence: Sequence, virtual_window
+):
+    sequence.start_persistent()
+    assert sequence.run({})
+    sequence.stop_persistent()
+
+    # 5 frames of fixation, 10 of target and 11 of the persistent frame
+    assert virtual_window.draw_calls == pytest.approx(26, abs=2)
+    assert virtual_window._toDraw == []
+    assert not any(component.visible for component in sequence.draw_list)
+
+
+def test_persistent_layer_is_cached(virtual_window):
+    sequence = Sequence(
+        {
+            "name": "Cached",
+            "cache_persistent": True,
+            "persistent": [
+                {"name": "frame", "type": "Rect", "depth": 1.0},
+                {"name": "placeholder", "type": "Rect", "depth": 1.0},
+            ],
+            "visual": [{"name": "target", "type": "text", "stop": 0.1}],
+        }
+    )
+
+    sequence.start_persistent()
+    assert sequence.run({})
+    assert sequence.run({})
+
+    assert sequence.layer_builds == 1
+    # Per run, 10 frames of target and 11 of the layer, instead of 11 of each persistent
+    assert virtual_window.draw_calls == pytest.approx(2 * (10 + 11), abs=4)
+
+    # Without the persistent components on screen, only the target is drawn
+    draw_calls = virtual_window.draw_calls
+    sequence.stop_persistent()
+    sequence.run({})
+    assert sequence.layer_builds == 1
+    assert virtual_window.draw_calls - draw_calls == pytest.approx(10, abs=2)
+
+
+class PlacedStim:
+    def __init__(self, win, vertices):
+        self.win = win
+        self.verticesPix = np.array(vertices, dtype=float)
+
+    def draw(self):
+        pass
+
+
+def test_layer_is_built_while_preparing_and_covers_its_stimuli(virtual_window):
+    sequence = Sequence(
+        {
+            "name": "Cached",
+            "cache_persistent": True,
+            "persistent": [{"name": "frame", "type": "Rect"}],
+            "visual": [{"name": "target", "type": "text", "stop": 0.1}],
+        }
+    )
+    frame = sequence.persistent[0]
+    frame.component = PlacedStim(virtual_window, [(-40, -30), (40, 30), (0, 60)])
+
+    sequence._prepare_run({})
+    assert sequence.layer_builds == 1
+    assert virtual_window.frames == 0
+
+    # 800x600 window, with 2 pixels of margin
+    left, top, right, bottom = sequence._layer.rect
+    assert (left, top, right, bottom) == pytest.approx(
+        (-42 / 400, 62 / 300, 42 / 400, -32 / 300)
+    )
+    assert sequence._layer.pos == pytest.approx((0.0, 15 / 300))
+
+    sequence.start_persistent()
+    assert sequence.run({})
+    assert sequence.layer_builds == 1
+
+
+def test_layer_of_real_stimuli_is_cropped(monkeypatch):
+    from psychopy import visual
+
+    try:
+        win = visual.Window(size=(200, 100), units="norm")
+    except Exception:
+        pytest.skip("No OpenGL window available")
+
+    monkeypatch.setattr(Window, "_window", win)
+    monkeypatch.setattr(Window, "virtual", False)
+    try:
+        rect = visual.Rect(win, width=0.5, height=0.4, pos=(0.5, 0.0))
+        layer = Window.create_layer([rect])
+
+        # The capture covers the rect and its margin, not the whole window
+        assert tuple(layer.size) == pytest.approx((50 + 4, 20 + 4), abs=2)
+    finally:
+        win.close()
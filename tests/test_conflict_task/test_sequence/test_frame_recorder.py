@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from conflict_task.sequence.frame_recorder import (
+    FLIP_TIMESTAMP,
+    LOOP_TIME,
+    FrameRecorder,
+)
+
+
+def test_summary_of_recorded_frames():
+    recorder = FrameRecorder(capacity=8)
+    recorder.reset(budget=0.010)
+
+    for frame, loop_time in enumerate([0.002, 0.004, 0.012]):
+        recorder.record(frame * 0.016, loop_time, 0.001, frame * 0.016 + 0.016)
+
+    assert recorder.get_data(prepend_key=False) == {
+        "count": 3,
+        "loop_time_mean": pytest.approx(0.006),
+        "loop_time_max": 0.012,
+        "over_budget": 1,
+        "budget": 0.010,
+    }
+
+
+def test_ring_buffer_keeps_latest_frames_in_order():
+    recorder = FrameRecorder(capacity=4)
+    recorder.reset(budget=1.0)
+
+    for frame in range(6):
+        recorder.record(float(frame), float(frame), 0.0, 0.0)
+
+    samples = recorder.get_samples()
+    assert list(samples[:, LOOP_TIME]) == [2.0, 3.0, 4.0, 5.0]
+    assert recorder.get_data()["frames.count"] == 6
+    assert recorder.get_data()["frames.loop_time_max"] == 5.0
+
+
+def test_missing_flip_timestamp_is_stored_as_nan():
+    recorder = FrameRecorder(capacity=4)
+    recorder.reset(budget=1.0)
+    recorder.record(0.0, 0.002, 0.001, None)
+
+    assert np.isnan(recorder.get_samples()[0, FLIP_TIMESTAMP])
+    assert recorder.get_data()["frames.count"] == 1
+
+
+def test_reset_clears_summary():
+    recorder = FrameRecorder(capacity=4)
+    recorder.reset(budget=0.001)
+    recorder.record(0.0, 0.002, 0.0, 0.0)
+    recorder.reset(budget=0.001)
+
+    assert recorder.get_data(prepend_key=False)["count"] == 0
+    assert recorder.get_data(prepend_key=False)["loop_time_mean"] is None
+    assert len(recorder.get_samples()) == 0
@@ -0,0 +1,116 @@
+import pytest
+
+from conflict_task.component import WaitComponent
+from conflict_task.constants import *
+from conflict_task.sequence.timeline import Timeline
+
+
+def test_components_start_and_stop_in_time_order():
+    early = WaitComponent({"start": 0.0, "stop": 0.5})
+    late = WaitComponent({"start": 0.2, "stop": 0.3})
+    timeline = Timeline([early, late])
+
+    timeline.advance(0.0, 0.0, 10.0)
+    assert early.started() and late.not_started()
+
+    timeline.advance(0.2, 0.2, 10.2)
+    assert late.started()
+
+    timeline.advance(0.3, 0.3, 10.3)
+    assert late.finished() and early.started()
+    assert timeline.unfinished == 1
+
+    timeline.advance(0.5, 0.5, 10.5)
+    assert early.finished()
+    assert timeline.unfinished == 0
+
+
+def test_stop_is_carried_when_due_on_start_frame():
+    component = WaitComponent({"start": 0.0, "stop": 0.0})
+    timeline = Timeline([component])
+
+    timeline.advance(0.0, 0.1, 10.1)
+    assert component.started()
+
+    timeline.advance(0.1, 0.2, 10.2)
+    assert component.finished()
+    assert component.time_stopped_flip == 0.2
+    assert timeline.unfinished == 0
+
+
+def test_infinite_component_never_finishes():
+    component = WaitComponent({"start": 0.0})
+    timeline = Timeline([component])
+
+    timeline.advance(0.0, 0.0, 0.0)
+    timeline.advance(100.0, 100.0, 100.0)
+    assert component.started()
+    assert timeline.unfinished == 1
+
+    timeline.stop_all(101.0, 101.0, 101.0)
+    assert component.finished()
+    assert timeline.unfinished == 0
+
+
+def test_compile_resets_components_for_next_run():
+    component = WaitComponent({"start": 0.1, "stop": 0.2})
+    timeline = Timeline([component])
+
+    timeline.advance(0.0, 0.1, 0.1)
+    timeline.advance(0.1, 0.2, 0.2)
+    assert component.finished()
+
+    component.refresh()
+    component.start_time = 0.3
+    component.stop_time = 0.4
+    timeline.compile()
+
+    timeline.advance(0.0, 0.2, 0.2)
+    assert component.not_started()
+    timeline.advance(0.0, 0.3, 0.3)
+    assert component.started()
+
+
+def test_on_screen_counts_started_visible_components():
+    stimulus = WaitComponent({"start": 0.1, "stop": 0.2})
+    other = WaitComponent({"start": 0.0, "stop": 0.3})
+    timeline = Timeline([stimulus, other], visible=[stimulus])
+
+    timeline.advance(0.0, 0.0, 0.0)
+    assert timeline.on_screen == 0
+
+    timeline.advance(0.1, 0.1, 0.1)
+    assert timeline.on_screen == 1
+
+    timeline.advance(0.2, 0.2, 0.2)
+    assert timeline.on_screen == 0
+
+
+def test_frame_timing_counts_flips():
+    # 1.133 s is 68 frames at 60 Hz, even if the flips drift from the nominal times
+    seconds = WaitComponent({"start": 0.0, "stop": 1.133})
+    frames = WaitComponent({"start_frames": 2, "duration_frames": 3})
+    timeline = Timeline([seconds, frames])
+    timeline.compile(frame_period=1 / 60)
+
+    for frame in range(68):
+        timeline.advance(frame / 60, frame / 60 + 0.002, 0.0, frame)
+        if frame == 2:
+            assert frames.started()
+        if frame == 5:
+            assert frames.finished()
+
+    assert seconds.started()
+
+    timeline.advance(68 / 60, 68 / 60 - 0.002, 0.0, 68)
+    assert seconds.finished()
+    assert timeline.unfinished == 0
+
+    # Timing errors are counted against the compiled flips, not the times in seconds
+    frames.record_timing_errors(1 / 60, frame_timing=True)
+    assert (frames.onset_error_frames, frames.offset_error_frames) == (0, 0)
+
+
+def test_stop_frame_before_start_frame_is_rejected():
+    with pytest.raises(SystemExit):
+        WaitComponent({"start_frames": 5, "stop_frames": 3})
@@ -0,0 +1,54 @@
+import pytest
+
+from conflict_task.sequence import Trial
+
+
+@pytest.fixture
+def trial(virtual_window):
+    return Trial(
+        {
+            "name": "Pipelined",
+            "post_trial_interval": 0.2,
+            "visual": [
+                {
+                    "name": "stimulus",
+                    "type": "text",
+                    "stop": 0.1,
+                    "variable": {"text": "stimulus_text"},
+                }
+            ],
+        }
+    )
+
+
+def test_next_trial_is_prepared_during_post_trial_interval(trial: Trial):
+    first = {"stimulus_text": "<<<<<"}
+    second = {"stimulus_text": ">>>>>"}
+
+    assert trial.run(first, next_trial_values=second)
+
+    stimulus = trial.visual[0]
+    assert stimulus.component.text == ">>>>>"
+    assert stimulus.not_started()
+
+    # Data still belongs to the trial that just ran
+    data = trial.get_data()
+    assert data["Pipelined.stimulus.time_stopped_flip"] == pytest.approx(0.1, abs=0.011)
+    assert trial.get_data(prepend_key=False)["time_started_flip"] == pytest.approx(
+        0.0, abs=0.001
+    )
+
+
+def test_prepared_trial_runs_without_preparing_again(trial: Trial, monkeypatch):
+    second = {"stimulus_text": ">>>>>"}
+    trial.run({"stimulus_text": "<<<<<"}, next_trial_values=second)
+
+    prepared = []
+    monkeypatch.setattr(trial, "_prepare_run", prepared.append)
+
+    assert trial.run(second)
+    assert prepared == []
+    assert trial.visual[0].finished()
+    assert trial.get_data()["Pipelined.stimulus.time_stopped_flip"] == pytest.approx(
+        0.1, abs=0.011
+    )